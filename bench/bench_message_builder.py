@@ -0,0 +1,46 @@
+# Micro-benchmark: per-message cost of building Gmail messages with a large attachment.
+# Compares create_message_with_attachment (reads and encodes the PDF for every message)
+# with MessageBuilder (encodes the PDF once and reuses the encoded part).
+#
+# Usage: python bench/bench_message_builder.py [ATTACHMENT_MB] [MESSAGES]
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.email_handler import MessageBuilder, create_message_with_attachment
+
+BODY = "<p>Dear Hiring Team,</p>" + "<p>I am excited to apply for this role.</p>" * 40
+
+def main():
+    attachment_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 3
+    messages = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = os.path.join(temp_dir, "CV.pdf")
+        with open(pdf_path, 'wb') as file:
+            file.write(os.urandom(int(attachment_mb * 1024 * 1024)))
+        print(f"Attachment: {attachment_mb} MB, messages: {messages}")
+
+        start = time.perf_counter()
+        for i in range(messages):
+            create_message_with_attachment("me@example.com", f"contact{i}@example.com", f"Application {i}", BODY, pdf_path)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        builder = MessageBuilder("me@example.com", pdf_path)
+        setup_time = time.perf_counter() - start
+        for i in range(messages):
+            builder.build(f"contact{i}@example.com", f"Application {i}", BODY)
+        builder_time = time.perf_counter() - start
+
+    print(f"  create_message_with_attachment : {legacy_time / messages * 1000:8.2f} ms/message")
+    print(f"  MessageBuilder (one-time setup): {setup_time * 1000:8.2f} ms")
+    print(f"  MessageBuilder (incl. setup)   : {builder_time / messages * 1000:8.2f} ms/message")
+    print(f"  Speedup                        : {legacy_time / builder_time:8.1f}x")
+
+if __name__ == "__main__":
+    main()
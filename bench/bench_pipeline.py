@@ -0,0 +1,225 @@
+# Benchmark: a full main() run on a synthetic tracker, against local fake OpenAI and Gmail servers.
+# Everything runs offline in a temporary folder; the real config.ini and tracker are not touched.
+# Reports throughput, per-stage latency (p50/p95, from the run report) and peak memory.
+#
+# Usage: python bench/bench_pipeline.py [--jobs 1000] [--mode FULL] [--openai-latency 0.5] ...
+#        python bench/bench_pipeline.py --help
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_servers
+
+COLUMNS = importlib.import_module('1_create_tracker_file').COLUMNS
+TECHNICAL = ['Python', 'SQL', 'AWS', 'Docker', 'Kubernetes', 'React', 'TypeScript', 'Django', 'PostgreSQL', 'Spark', 'Terraform', 'Java']
+SOFT = ['communication skills', 'a team player', 'problem-solving', 'attention to detail', 'self-motivated', 'stakeholder management']
+FILLER = ['We are a fast growing company with an amazing culture.', 'Our office has free snacks and a rooftop garden.',
+          'We offer flexible hours, remote days and a generous budget for conferences.', 'Join a mission-driven team that ships every week.']
+CV = """Jane Doe
+jane.doe@example.com | +1 555 0100
+
+## Summary
+Backend engineer with 6 years of experience building data-heavy web services.
+
+## Experience
+Senior Engineer at Acme: Python, Django and PostgreSQL services on AWS, deployed with Docker and Kubernetes.
+Engineer at Globex: data pipelines in Spark and SQL, dashboards in Tableau.
+
+## Projects
+Open-source React and TypeScript admin panel used by 2,000 teams.
+
+## Skills
+Python, SQL, AWS, Docker, Kubernetes, Terraform, React, TypeScript, communication, teamwork, mentoring.
+"""
+
+def make_description(rng, job_number, covered):
+    """
+    Covered descriptions are mostly requirement lines the local skills taxonomy recognizes; the others need OpenAI.
+    """
+    lines = [f"Job {job_number}: we are hiring an engineer to join our platform team."]
+    if covered:
+        lines += [f"- {rng.randint(2, 6)}+ years of experience with {skill}" for skill in rng.sample(TECHNICAL, 4)]
+        lines += [f"- You are {soft} and enjoy working with others" for soft in rng.sample(SOFT, 2)]
+    else:
+        lines += rng.sample(FILLER, 3) + [f"Some experience with {rng.choice(TECHNICAL)} is a plus."]
+    return "\n".join(lines)
+
+def make_tracker(jobs, contacts, status, local_share, duplicate_share=0.0, seed=42):
+    """
+    Builds a tracker in the 1_create_tracker_file.COLUMNS schema with `jobs` rows in `status`.
+    A `duplicate_share` of the rows repeat an earlier job, as if it was found on another platform.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for i in range(jobs):
+        if rows and rng.random() < duplicate_share:
+            copy = dict(rng.choice(rows))
+            copy['Platform'] = 'Company website'
+            copy['Job Description'] += "\nApply through our careers page."
+            rows.append(copy)
+            continue
+        people = [f"Person {i}-{c}" for c in range(contacts)]
+        rows.append({
+            'Status': status,
+            'Company': f"Company {i}",
+            'Job Title': f"Backend Engineer {i}",
+            'Platform': rng.choice(['LinkedIn', 'Indeed', 'Company website']),
+            'Location': 'Remote',
+            'Job Description': make_description(rng, i, rng.random() < local_share),
+            'Company Description': f"Company {i} builds software for logistics teams.",
+            'Contact Person': ", ".join(people),
+            'Contact Email': ", ".join(f"person{i}.{c}@example.com" for c in range(contacts)),
+        })
+        if status == 'Approved':
+            rows[-1]['Cover Letter/Message'] = json.dumps([{"subject": "Application", "body": "<p>Hello</p>"}] * contacts)
+    return pd.DataFrame(rows, columns=COLUMNS).fillna('')
+
+def write_workspace(workdir, args, openai_port, gmail_port):
+    """
+    Creates config.ini, the CV files, prompts and the tracker in `workdir`.
+    """
+    os.makedirs(os.path.join(workdir, 'data'), exist_ok=True)
+    for name in ('prompts.yaml', 'skills_taxonomy.yaml'):
+        shutil.copy(os.path.join(ROOT, name), workdir)
+    with open(os.path.join(workdir, 'cv.md'), 'w', encoding='utf-8') as file:
+        file.write(CV)
+    with open(os.path.join(workdir, 'cv.pdf'), 'wb') as file:
+        file.write(random.Random(0).randbytes(args.attachment_kb * 1024))
+
+    with open(os.path.join(ROOT, 'config.ini.example'), 'r', encoding='utf-8') as file:
+        config = file.read()
+    replacements = {
+        'path/to/your/Master_CV.md': 'cv.md',
+        'path/to/your/CV.pdf': 'cv.pdf',
+        'BASE_URL =': f'BASE_URL = http://127.0.0.1:{openai_port}/v1',
+        'API_ENDPOINT =': f'API_ENDPOINT = http://127.0.0.1:{gmail_port}',
+        'MAX_SENDS_PER_SECOND = 2': f'MAX_SENDS_PER_SECOND = {args.max_sends_per_second}',
+        'BATCH_POLL_INTERVAL = 60': 'BATCH_POLL_INTERVAL = 0',
+        'MAX_CONCURRENT_REQUESTS = 4': f'MAX_CONCURRENT_REQUESTS = {args.workers}',
+        'STREAM = true': f'STREAM = {str(args.stream).lower()}',
+        # The fake server reports its limits in x-ratelimit-* headers when it has any.
+        'REQUESTS_PER_MINUTE = 500': f'REQUESTS_PER_MINUTE = {args.openai_rpm}',
+        'TOKENS_PER_MINUTE = 30000': f'TOKENS_PER_MINUTE = {args.openai_tpm}',
+        'RATE_LIMIT_MAX_WAIT = 600': f'RATE_LIMIT_MAX_WAIT = {args.max_wait}',
+    }
+    for old, new in replacements.items():
+        if old not in config:
+            raise ValueError(f"config.ini.example no longer contains '{old}'; update the benchmark.")
+        config = config.replace(old, new)
+    with open(os.path.join(workdir, 'config.ini'), 'w', encoding='utf-8') as file:
+        file.write(config)
+
+    status = 'Approved' if args.approved else 'Pending'
+    make_tracker(args.jobs, args.contacts, status, args.local_share, args.duplicate_share).to_excel(os.path.join(workdir, 'data', 'SeekingJobs.xlsx'), index=False)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end benchmark of main() against local fake OpenAI and Gmail servers.")
+    parser.add_argument('--jobs', type=int, default=200, help="Number of jobs in the synthetic tracker.")
+    parser.add_argument('--contacts', type=int, default=2, help="Contacts (emails) per job.")
+    parser.add_argument('--mode', choices=['REVIEW', 'FULL', 'BATCH'], type=str.upper, default='FULL')
+    parser.add_argument('--approved', action='store_true', help="Start with 'Approved' jobs, to measure sending only.")
+    parser.add_argument('--local-share', type=float, default=0.5, help="Share of descriptions the local skills taxonomy covers.")
+    parser.add_argument('--duplicate-share', type=float, default=0.0, help="Share of jobs that repeat an earlier job (near-duplicates).")
+    parser.add_argument('--workers', type=int, default=4, help="MAX_CONCURRENT_REQUESTS.")
+    parser.add_argument('--stream', action=argparse.BooleanOptionalAction, default=True, help="Stream OpenAI answers.")
+    parser.add_argument('--attachment-kb', type=int, default=300, help="Size of the CV attachment.")
+    parser.add_argument('--max-sends-per-second', type=float, default=1000, help="Client-side Gmail throttle.")
+    parser.add_argument('--openai-latency', type=float, default=0.2, help="Mean seconds before an OpenAI answer starts.")
+    parser.add_argument('--openai-tokens-per-second', type=float, default=0, help="Streaming speed (0 for as fast as possible).")
+    parser.add_argument('--openai-error-rate', type=float, default=0.0, help="Share of OpenAI requests answered with a 500.")
+    parser.add_argument('--openai-rate-limit', type=float, default=0, help="OpenAI requests per second before 429s (0 for none).")
+    parser.add_argument('--openai-rpm', type=float, default=0, help="Client-side starting REQUESTS_PER_MINUTE (0 to learn it from the server's headers).")
+    parser.add_argument('--openai-tpm', type=float, default=0, help="Client-side starting TOKENS_PER_MINUTE (0 for none).")
+    parser.add_argument('--max-wait', type=float, default=600, help="RATE_LIMIT_MAX_WAIT.")
+    parser.add_argument('--gmail-latency', type=float, default=0.05, help="Mean seconds per Gmail HTTP request.")
+    parser.add_argument('--gmail-error-rate', type=float, default=0.0, help="Share of Gmail sends answered with a 503.")
+    parser.add_argument('--gmail-rate-limit', type=float, default=0, help="Gmail sends per second before 429s (0 for none).")
+    parser.add_argument('--tracemalloc', action='store_true', help="Also report the peak of Python allocations (slows the run down).")
+    parser.add_argument('--verbose', action='store_true', help="Show main()'s own output.")
+    parser.add_argument('--json', action='store_true', help="Print the result as JSON.")
+    return parser.parse_args(argv)
+
+def run(args):
+    server_process, openai_port, gmail_port = fake_servers.start_servers(
+        {'latency': args.openai_latency, 'error_rate': args.openai_error_rate, 'rate_limit': args.openai_rate_limit, 'tokens_per_second': args.openai_tokens_per_second},
+        {'latency': args.gmail_latency, 'error_rate': args.gmail_error_rate, 'rate_limit': args.gmail_rate_limit},
+    )
+    workdir = tempfile.mkdtemp(prefix='bench_pipeline_')
+    previous_dir = os.getcwd()
+    try:
+        write_workspace(workdir, args, openai_port, gmail_port)
+        os.chdir(workdir)
+        import main
+        from modules import metrics_handler
+
+        if args.tracemalloc:
+            tracemalloc.start()
+        output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        started = time.perf_counter()
+        with output:
+            try:
+                main.main(['--mode', args.mode])
+            except SystemExit as e:
+                if e.code:
+                    raise RuntimeError(f"main() exited with code {e.code}; run with --verbose to see why.")
+        elapsed = time.perf_counter() - started
+        traced_peak = tracemalloc.get_traced_memory()[1] if args.tracemalloc else None
+
+        statuses = pd.read_excel(os.path.join('data', 'SeekingJobs.xlsx'), dtype=str)['Status'].value_counts().to_dict()
+        report = metrics_handler.build_report()
+        gmail_stats = fake_servers.get_stats(gmail_port)
+        return {
+            "jobs": args.jobs,
+            "mode": args.mode,
+            "seconds": round(elapsed, 3),
+            "jobs_per_second": round(args.jobs / elapsed, 2),
+            "emails_sent_per_second": round(gmail_stats.get('sent', 0) / elapsed, 2),
+            "final_statuses": statuses,
+            "stages": report['stages'],
+            "counters": report['counters'],
+            "openai_server": fake_servers.get_stats(openai_port),
+            "gmail_server": gmail_stats,
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1), # KiB on Linux.
+            "peak_traced_mb": round(traced_peak / 1024 / 1024, 1) if traced_peak is not None else None,
+        }
+    finally:
+        os.chdir(previous_dir)
+        server_process.terminate()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def print_result(result):
+    print(f"{result['jobs']} jobs in {result['mode']} mode: {result['seconds']:.2f}s, "
+          f"{result['jobs_per_second']:.1f} jobs/s, {result['emails_sent_per_second']:.1f} emails sent/s")
+    print(f"Final statuses: {result['final_statuses']}")
+    print(f"{'stage':<24}{'calls':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'total s':>10}")
+    for stage, stats in result['stages'].items():
+        print(f"{stage:<24}{stats['count']:>8}{stats['p50'] * 1000:>10.1f}{stats['p95'] * 1000:>10.1f}{stats['max'] * 1000:>10.1f}{stats['total']:>10.2f}")
+    print(f"Client counters: {result['counters']}")
+    print(f"OpenAI server: {result['openai_server']}")
+    print(f"Gmail server: {result['gmail_server']}")
+    traced = f", traced Python peak {result['peak_traced_mb']} MB" if result['peak_traced_mb'] is not None else ""
+    print(f"Peak RSS {result['peak_rss_mb']} MB{traced}")
+
+if __name__ == '__main__':
+    arguments = parse_args()
+    benchmark_result = run(arguments)
+    if arguments.json:
+        print(json.dumps(benchmark_result, indent=2))
+    else:
+        print_result(benchmark_result)
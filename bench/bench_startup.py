@@ -0,0 +1,103 @@
+# Benchmark: how long the assistant takes to start, measured with `python -X importtime`.
+# Reports the total import time of main.py and the slowest imports, then times a full
+# `python main.py --status` run on a synthetic tracker in a temporary folder.
+#
+# Usage: python bench/bench_startup.py [--jobs 1000] [--runs 5] [--top 15]
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+def parse_importtime(stderr):
+    """
+    Returns {module: (self_us, cumulative_us)} from the `-X importtime` lines of `stderr`.
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+def measure_imports(statement, runs):
+    """
+    Imports `statement` in `runs` fresh interpreters. Returns the median cumulative time of
+    each module in milliseconds, and the median wall time of the whole interpreter start.
+    """
+    samples, walls = {}, []
+    for _ in range(runs):
+        started = time.perf_counter()
+        completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=ROOT, capture_output=True, text=True)
+        walls.append(time.perf_counter() - started)
+        if completed.returncode:
+            raise RuntimeError(f"'{statement}' failed:\n{completed.stderr[-2000:]}")
+        for module, (_, cumulative_us) in parse_importtime(completed.stderr).items():
+            samples.setdefault(module, []).append(cumulative_us / 1000)
+    return {module: statistics.median(values) for module, values in samples.items()}, statistics.median(walls)
+
+def measure_status(jobs, runs):
+    """
+    Times `python main.py --status` on a tracker with `jobs` rows. Returns the median seconds.
+    """
+    import bench_pipeline
+    workdir = tempfile.mkdtemp(prefix='bench_startup_')
+    try:
+        arguments = bench_pipeline.parse_args(['--jobs', str(jobs)])
+        bench_pipeline.write_workspace(workdir, arguments, 0, 0)
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            completed = subprocess.run([sys.executable, os.path.join(ROOT, 'main.py'), '--status'], cwd=workdir, capture_output=True, text=True)
+            timings.append(time.perf_counter() - started)
+            if completed.returncode:
+                raise RuntimeError(f"main.py --status failed:\n{completed.stdout[-2000:]}{completed.stderr[-2000:]}")
+        return statistics.median(timings)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Startup-time benchmark of main.py, based on python -X importtime.")
+    parser.add_argument('--jobs', type=int, default=1000, help="Number of jobs in the tracker used for --status.")
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters per measurement (the median is reported).")
+    parser.add_argument('--top', type=int, default=15, help="Number of slowest imports to list.")
+    parser.add_argument('--json', action='store_true', help="Print the result as JSON.")
+    return parser.parse_args(argv)
+
+def run(args):
+    baseline, baseline_wall = measure_imports('pass', args.runs)
+    modules, import_wall = measure_imports('import main', args.runs)
+    # Modules the bare interpreter already loads (site, encodings, ...) are not main.py's cost.
+    own = {module: ms for module, ms in modules.items() if module not in baseline}
+    return {
+        "interpreter_start_seconds": round(baseline_wall, 3),
+        "import_main_seconds": round(import_wall, 3),
+        "import_main_cumulative_ms": round(modules.get('main', 0), 1),
+        "slowest_imports_ms": {module: round(ms, 1) for module, ms in sorted(own.items(), key=lambda item: -item[1])[:args.top]},
+        "status_jobs": args.jobs,
+        "status_seconds": round(measure_status(args.jobs, args.runs), 3),
+    }
+
+def print_result(result):
+    print(f"Bare interpreter start: {result['interpreter_start_seconds'] * 1000:.0f}ms")
+    print(f"'import main': {result['import_main_seconds'] * 1000:.0f}ms wall, {result['import_main_cumulative_ms']:.0f}ms of imports")
+    print(f"{'module':<48}{'cumulative ms':>14}")
+    for module, ms in result['slowest_imports_ms'].items():
+        print(f"{module:<48}{ms:>14.1f}")
+    print(f"'main.py --status' on {result['status_jobs']} jobs: {result['status_seconds'] * 1000:.0f}ms")
+
+if __name__ == '__main__':
+    arguments = parse_args()
+    benchmark_result = run(arguments)
+    if arguments.json:
+        print(json.dumps(benchmark_result, indent=2))
+    else:
+        print_result(benchmark_result)
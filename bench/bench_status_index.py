@@ -0,0 +1,80 @@
+# Benchmark: status counting and row selection on a large synthetic tracker.
+# Compares the original full-frame scans + iterrows() + per-cell .loc writes
+# with the StatusIndex / RowUpdateBuffer approach used by main.py.
+#
+# Usage: python bench/bench_status_index.py [ROWS]
+import importlib
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.status_handler import StatusIndex, RowUpdateBuffer
+
+COLUMNS = importlib.import_module('1_create_tracker_file').COLUMNS
+STATUSES = ['Applied'] * 70 + ['Ready to Send'] * 20 + ['Failed'] * 8 + ['Pending', 'Approved']
+
+def make_tracker(rows, seed=42):
+    rng = random.Random(seed)
+    data = {column: [''] * rows for column in COLUMNS}
+    data['Status'] = [rng.choice(STATUSES) for _ in range(rows)]
+    data['Job Title'] = [f"Job {i}" for i in range(rows)]
+    data['Company'] = [f"Company {i % 997}" for i in range(rows)]
+    data['Job Description'] = ["Python SQL AWS communication teamwork " * 20] * rows
+    return pd.DataFrame(data, columns=COLUMNS)
+
+def legacy_pass(df):
+    pending_count = len(df[df['Status'].str.lower() == 'pending'])
+    approved_count = len(df[df['Status'].str.lower() == 'approved'])
+    for index, row in df.iterrows():
+        status = str(row.get('Status', '')).strip().lower()
+        if status == 'pending':
+            df.loc[index, 'Technical Skills'] = "Python, SQL"
+            df.loc[index, 'Soft Skills'] = "Communication"
+            df.loc[index, 'Status'] = 'Ready to Send'
+        if df.loc[index, 'Status'].strip().lower() == 'approved':
+            df.loc[index, 'Status'] = 'Applied'
+    return pending_count, approved_count
+
+def indexed_pass(df):
+    status_index = StatusIndex(df['Status'])
+    pending_count = status_index.count('pending')
+    approved_count = status_index.count('approved')
+    updates = RowUpdateBuffer(status_index)
+    for index in status_index.rows('pending'):
+        updates.set(index, {'Technical Skills': "Python, SQL", 'Soft Skills': "Communication", 'Status': 'Ready to Send'})
+    updates.apply(df)
+    for index in status_index.rows('approved'):
+        updates.set(index, {'Status': 'Applied'})
+    updates.apply(df)
+    return pending_count, approved_count
+
+def timed(function, df):
+    start = time.perf_counter()
+    result = function(df)
+    return result, time.perf_counter() - start
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    base = make_tracker(rows)
+    print(f"Synthetic tracker: {rows} rows")
+
+    legacy_df, indexed_df = base.copy(), base.copy()
+    legacy_counts, legacy_time = timed(legacy_pass, legacy_df)
+    indexed_counts, indexed_time = timed(indexed_pass, indexed_df)
+
+    assert legacy_counts == indexed_counts, (legacy_counts, indexed_counts)
+    assert legacy_df.equals(indexed_df), "Both passes must produce the same tracker."
+
+    print(f"  Pending: {legacy_counts[0]}, Approved: {legacy_counts[1]}")
+    print(f"  Full scans + iterrows : {legacy_time * 1000:10.1f} ms")
+    print(f"  StatusIndex + buffer  : {indexed_time * 1000:10.1f} ms")
+    print(f"  Speedup               : {legacy_time / indexed_time:10.1f}x")
+
+if __name__ == "__main__":
+    main()
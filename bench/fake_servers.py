@@ -0,0 +1,290 @@
+# Local stand-ins for the OpenAI and Gmail APIs, used by the benchmarks so runs need no network access.
+# Both servers answer with valid, deterministic content and can add latency, random errors and rate limits.
+#
+# Run them in a separate process with start_servers(), so they do not share the benchmarked process's
+# CPU time (GIL) or memory. GET /__stats on either server returns its request counters.
+import email
+import json
+import multiprocessing
+import random
+import re
+import threading
+import time
+import urllib.request
+import uuid
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+class TokenBucket:
+    """
+    Allows `rate` events per second with bursts of up to `rate` events. A rate of 0 means unlimited.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        if not self.rate:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def headers(self):
+        """
+        OpenAI-style x-ratelimit-* headers for the request limit (per minute), or none when unlimited.
+        """
+        if not self.rate:
+            return {}
+        with self._lock:
+            remaining = max(0, int(self.tokens))
+            reset = (self.rate - self.tokens) / self.rate
+        return {'x-ratelimit-limit-requests': str(int(self.rate * 60)), 'x-ratelimit-remaining-requests': str(remaining), 'x-ratelimit-reset-requests': f"{reset:.3f}s"}
+
+class FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    settings = {}
+    stats = None
+    bucket = None
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def count(self, key, value=1):
+        with self.lock:
+            self.stats[key] = self.stats.get(key, 0) + value
+
+    def send_json(self, obj, code=200, headers=None, raw=None):
+        data = raw if raw is not None else json.dumps(obj).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def latency(self):
+        latency = self.settings.get('latency', 0)
+        if latency:
+            time.sleep(random.uniform(0.5 * latency, 1.5 * latency))
+
+    def do_GET(self):
+        if self.path == '/__stats':
+            with self.lock:
+                return self.send_json(dict(self.stats))
+        self.handle_get()
+
+    def handle_get(self):
+        self.send_json({"error": {"message": "not found"}}, 404)
+
+# --- OpenAI ---
+def _skills_for(description):
+    words = sorted(set(re.findall(r"[A-Z][a-zA-Z+#]+", description)))[:6]
+    return {"technical_skills": words or ["Python"], "soft_skills": ["Communication", "Teamwork"]}
+
+def _field(prompt, name, default):
+    match = re.search(rf"\*\*{name}:\*\* (.*)", prompt)
+    return match.group(1).strip() if match else default
+
+def answer_chat(body):
+    """
+    Returns a valid JSON answer for any of the assistant's prompts.
+    """
+    prompt = body['messages'][-1]['content']
+    if 'Job Descriptions:' in prompt:
+        sections = re.split(r"^### Job ID: (.+)$", prompt.split('Job Descriptions:', 1)[1], flags=re.M)[1:]
+        return json.dumps({"results": {key.strip(): _skills_for(text) for key, text in zip(sections[::2], sections[1::2])}})
+    if 'Job Description:' in prompt and 'Contact Person' not in prompt and 'Contact People' not in prompt:
+        return json.dumps(_skills_for(prompt))
+    title = _field(prompt, 'Job Title', 'the role')
+    body_html = "<p>" + " ".join(["I am excited to apply for this position."] * 8) + "</p><p>Please find my CV attached.</p>"
+    if 'Contact People:' in prompt:
+        people = re.findall(r"^- (.+)$", prompt.split('Contact People:', 1)[1], re.M)
+        return json.dumps({"emails": [{"contact_person": person, "subject": f"Application for {title}", "body": f"<p>Dear {person},</p>{body_html}"} for person in people]})
+    person = _field(prompt, 'Contact Person', 'Hiring Manager')
+    return json.dumps({"subject": f"Application for {title}", "body": f"<p>Dear {person},</p>{body_html}"})
+
+def _completion(body, content):
+    prompt_tokens = len(json.dumps(body['messages'])) // 4
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "object": "chat.completion", "created": int(time.time()), "model": body['model'],
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4, "total_tokens": prompt_tokens + len(content) // 4},
+    }
+
+class FakeOpenAIHandler(FakeHandler):
+    files = {}
+    batches = {}
+
+    def do_POST(self):
+        data = self.read_body()
+        self.count('requests')
+        if not self.bucket.take():
+            self.count('rate_limited')
+            return self.send_json({"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}}, 429, {'retry-after': '1', **self.bucket.headers()})
+        if random.random() < self.settings.get('error_rate', 0):
+            self.count('errors')
+            return self.send_json({"error": {"message": "The server had an error", "type": "server_error"}}, 500)
+
+        if self.path.endswith('/chat/completions'):
+            body = json.loads(data)
+            self.latency()
+            content = answer_chat(body)
+            self.count('completions')
+            if body.get('stream'):
+                return self.stream(body, content)
+            return self.send_json(_completion(body, content), headers=self.bucket.headers())
+        if self.path.endswith('/files'):
+            return self.create_file(data)
+        if self.path.endswith('/batches'):
+            batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+            self.batches[batch_id] = {"input_file_id": json.loads(data)['input_file_id'], "output_file_id": None}
+            return self.send_json(self.batch(batch_id))
+        self.send_json({"error": {"message": "not found"}}, 404)
+
+    def stream(self, body, content):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        for name, value in self.bucket.headers().items():
+            self.send_header(name, value)
+        self.end_headers()
+
+        def emit(payload):
+            data = f"data: {payload}\n\n".encode()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+        token_delay = 1 / self.settings['tokens_per_second'] if self.settings.get('tokens_per_second') else 0
+        completion = _completion(body, content)
+        try:
+            for start in range(0, len(content), 4): # About four characters per token.
+                chunk = {"id": completion['id'], "object": "chat.completion.chunk", "created": completion['created'], "model": body['model'],
+                         "choices": [{"index": 0, "delta": {"content": content[start:start + 4]}, "finish_reason": None}]}
+                emit(json.dumps(chunk))
+                if token_delay:
+                    time.sleep(token_delay)
+            emit(json.dumps({"id": completion['id'], "object": "chat.completion.chunk", "created": completion['created'], "model": body['model'], "choices": [], "usage": completion['usage']}))
+            emit("[DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.count('cancelled_streams')
+
+    def create_file(self, data):
+        # The multipart upload has a 'purpose' field and the JSONL file; only the file part has a filename.
+        boundary = self.headers['Content-Type'].split('boundary=', 1)[1].encode()
+        part = next(part for part in data.split(b'--' + boundary) if b'filename=' in part.split(b'\r\n\r\n', 1)[0])
+        content = part.split(b'\r\n\r\n', 1)[1].rsplit(b'\r\n', 1)[0]
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        self.files[file_id] = content
+        return self.send_json({"id": file_id, "object": "file", "bytes": len(content), "created_at": int(time.time()), "filename": "batch_input.jsonl", "purpose": "batch", "status": "processed"})
+
+    def batch(self, batch_id):
+        batch = self.batches[batch_id]
+        return {"id": batch_id, "object": "batch", "endpoint": "/v1/chat/completions", "input_file_id": batch['input_file_id'], "completion_window": "24h",
+                "status": "completed" if batch['output_file_id'] else "in_progress", "created_at": int(time.time()), "output_file_id": batch['output_file_id'],
+                "request_counts": {"completed": 0, "failed": 0, "total": 0}}
+
+    def handle_get(self):
+        match = re.match(r".*/batches/([^/]+)$", self.path)
+        if match:
+            batch = self.batches[match.group(1)]
+            response = self.batch(match.group(1))
+            if not batch['output_file_id']: # Every batch finishes on its second poll.
+                lines = []
+                for line in self.files[batch['input_file_id']].decode().splitlines():
+                    request = json.loads(line)
+                    self.count('completions')
+                    lines.append(json.dumps({"id": uuid.uuid4().hex, "custom_id": request['custom_id'], "response": {"status_code": 200, "body": _completion(request['body'], answer_chat(request['body']))}}))
+                batch['output_file_id'] = f"file-{uuid.uuid4().hex[:12]}"
+                self.files[batch['output_file_id']] = "\n".join(lines).encode()
+            return self.send_json(response)
+        match = re.match(r".*/files/([^/]+)/content$", self.path)
+        if match:
+            return self.send_json(None, raw=self.files[match.group(1)])
+        super().handle_get()
+
+# --- Gmail ---
+class FakeGmailHandler(FakeHandler):
+
+    def send_one(self, body):
+        """
+        Returns the (status line, JSON body) of one messages.send call.
+        """
+        self.count('messages')
+        if not self.bucket.take():
+            self.count('rate_limited')
+            return '429 Too Many Requests', {"error": {"code": 429, "message": "User-rate limit exceeded", "errors": [{"reason": "userRateLimitExceeded"}]}}
+        if random.random() < self.settings.get('error_rate', 0):
+            self.count('errors')
+            return '503 Service Unavailable', {"error": {"code": 503, "message": "Backend Error"}}
+        self.count('sent')
+        self.count('bytes', len(body))
+        return '200 OK', {"id": uuid.uuid4().hex[:16], "labelIds": ["SENT"]}
+
+    def do_POST(self):
+        data = self.read_body()
+        self.latency()
+        if not self.path.startswith('/batch'):
+            status, payload = self.send_one(data)
+            return self.send_json(payload, int(status.split()[0]))
+
+        self.count('batches')
+        request = email.message_from_bytes(b'Content-Type: ' + self.headers['Content-Type'].encode() + b'\r\n\r\n' + data)
+        boundary = f"batch_{uuid.uuid4().hex}"
+        parts = []
+        for part in request.get_payload():
+            inner = part.get_payload()
+            body = re.split(r"\r?\n\r?\n", inner, maxsplit=1)[1]
+            status, payload = self.send_one(body.encode())
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{part['Content-ID'].strip('<>')}>\r\n\r\n"
+                f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n\r\n{json.dumps(payload)}\r\n"
+            )
+        data = (''.join(parts) + f"--{boundary}--\r\n").encode()
+        self.send_response(200)
+        self.send_header('Content-Type', f'multipart/mixed; boundary={boundary}')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+# --- Starting the servers ---
+def make_server(handler_class, settings, port=0):
+    handler = type(handler_class.__name__, (handler_class,), {
+        'settings': settings, 'stats': {}, 'bucket': TokenBucket(settings.get('rate_limit', 0)), 'lock': threading.Lock(),
+    })
+    return ThreadingHTTPServer(('127.0.0.1', port), handler)
+
+def _serve(openai_settings, gmail_settings, ports):
+    servers = [make_server(FakeOpenAIHandler, openai_settings), make_server(FakeGmailHandler, gmail_settings)]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    ports.put([server.server_port for server in servers])
+    threading.Event().wait()
+
+def start_servers(openai_settings=None, gmail_settings=None):
+    """
+    Starts both fake servers in a child process. Settings: latency (seconds), error_rate (0 to 1),
+    rate_limit (requests per second, 0 for none) and, for OpenAI, tokens_per_second when streaming.
+    Returns (process, openai_port, gmail_port); call process.terminate() when done.
+    """
+    ports = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve, args=(openai_settings or {}, gmail_settings or {}, ports), daemon=True)
+    process.start()
+    openai_port, gmail_port = ports.get(timeout=30)
+    return process, openai_port, gmail_port
+
+def get_stats(port):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/__stats") as response:
+        return json.loads(response.read())
@@ -1,7 +1,11 @@
-from modules import config_handler, excel_handler, ai_handler, file_handler, email_handler, ui_handler
+from modules import config_handler, excel_handler, ai_handler, file_handler, email_handler, ui_handler, cache_handler, batch_handler, journal_handler, status_handler, context_handler, skills_handler, metrics_handler, dedup_handler, rate_limit_handler
 import sys
 import json
+import argparse
 import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 def create_html_signature(config):
@@ -26,7 +30,7 @@ def create_html_signature(config):
 def initial_checks(config):
     """
     Performs initial checks for required files and folders.
-    Returns the DataFrame if successful, otherwise None.
+    Returns a DataFrame holding only the 'Status' column if successful, otherwise None.
     """
     excel_path = config['PATHS']['EXCEL_FILE_PATH']
     data_dir = os.path.dirname(excel_path)
@@ -46,136 +50,780 @@ def initial_checks(config):
         ui_handler.print_info("Please close it and run the script again.")
         return None
         
-    jobs_df = excel_handler.read_excel_file(excel_path)
-    if jobs_df.empty:
+    status_df = excel_handler.read_excel_file(excel_path, columns=['Status'])
+    if status_df.empty:
         ui_handler.print_warning("The Excel file is empty.")
         ui_handler.print_info("Please add at least one job application with the status 'Pending' to get started.")
         return None
         
-    return jobs_df
+    return status_df
 
-def main():
-    ui_handler.print_header("AI Job Assistant")
-    
-    # --- 1. Initial Setup & Checks ---
+def parse_contacts(row):
+    return [p.strip() for p in row['Contact Person'].split(',') if p.strip()]
+
+def parse_contact_emails(row):
+    return [e.strip() for e in str(row.get('Contact Email', '')).split(',') if e.strip()]
+
+def skills_from_row(row):
+    """
+    Returns the skills already saved in a tracker row, in the form extract_skills returns, or None.
+    """
+    technical_skills = [s.strip() for s in str(row.get('Technical Skills', '')).split(',') if s.strip()]
+    soft_skills = [s.strip() for s in str(row.get('Soft Skills', '')).split(',') if s.strip()]
+    if not technical_skills and not soft_skills:
+        return None
+    return {"technical_skills": technical_skills, "soft_skills": soft_skills}
+
+def format_skills(extracted_skills, row):
+    """
+    Returns the (technical, soft) skills text for a job, keeping the row's current values if extraction failed.
+    """
+    if not extracted_skills:
+        return row['Technical Skills'], row['Soft Skills']
+    return ", ".join(extracted_skills.get('technical_skills', [])), ", ".join(extracted_skills.get('soft_skills', []))
+
+def build_email_details(row, technical_skills, soft_skills, context, person=''):
+    """
+    Builds the email prompt fields for a job. The CV and job description are trimmed by the
+    ContextCompactor to the parts most relevant to the job title and extracted skills.
+    """
+    query = f"{row['Job Title']} {technical_skills} {soft_skills}"
+    job_description = context.compact_job_description(str(row.get('Job Description', '')), query)
+    return {"contact_person": person, "job_title": row['Job Title'], "company_name": row['Company'], "platform": row['Platform'], "company_description": row['Company Description'], "job_description": job_description, "technical_skills": technical_skills, "soft_skills": soft_skills, "cv_content": context.compact_cv(query)}
+
+def process_pending_jobs(pending_jobs, prompts, context, max_workers, skill_token_budget=0, skill_sources=None, known_skills=None):
+    """
+    Extracts skills and generates emails for all 'Pending' jobs using a bounded thread pool.
+    With a positive `skill_token_budget`, several job descriptions share one skill extraction request.
+    Duplicate jobs take their skills from `known_skills` ({row index: skills}) or from an earlier
+    pending row (`skill_sources`, {row index: source row index}) instead of extracting them again.
+    Yields (row index, (extracted_skills, email_contents)) in row order, each job as soon as it and
+    all jobs before it are finished.
+    """
+    skill_sources = skill_sources or {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Jobs covered by the local skills taxonomy skip the AI request.
+        # A budget of 0 puts every remaining description in a group of its own.
+        extracted_skills = dict(known_skills or {})
+        descriptions = {}
+        for index, row in pending_jobs.iterrows():
+            if index in extracted_skills or index in skill_sources:
+                continue
+            local_skills = ai_handler.extract_skills_locally(row.get('Job Description', ''))
+            if local_skills:
+                extracted_skills[index] = local_skills
+            else:
+                descriptions[index] = row.get('Job Description', '')
+
+        skill_futures = {}
+        for group in ai_handler.pack_descriptions(descriptions, skill_token_budget):
+            group_future = executor.submit(ai_handler.extract_skills_batch, group, prompts)
+            skill_futures.update({index: group_future for index in group})
+
+        # Email generation for a job starts as soon as its own skills are ready.
+        email_futures = {}
+        progress = ui_handler.ProgressDisplay(len(pending_jobs))
+        try:
+            for index, row in pending_jobs.iterrows():
+                if index not in extracted_skills:
+                    source = skill_sources.get(index, index)
+                    if source not in extracted_skills:
+                        extracted_skills[source] = skill_futures[source].result()[source]
+                    extracted_skills[index] = extracted_skills[source]
+                technical_skills, soft_skills = format_skills(extracted_skills[index], row)
+                # One request covers all of the job's contacts.
+                details = build_email_details(row, technical_skills, soft_skills, context)
+                email_futures[index] = executor.submit(ai_handler.generate_emails_for_contacts, details, parse_contacts(row), prompts, progress.tracker(index, row['Job Title']))
+                email_futures[index].add_done_callback(lambda _, index=index: progress.finish(index))
+
+            for index in pending_jobs.index:
+                yield index, (extracted_skills[index], email_futures[index].result())
+        finally:
+            # Restores the normal output, even if the caller stops early.
+            progress.close()
+
+def validate_batch_output(content, response_model, messages, temperature):
+    """
+    Validates one batch answer and caches it. Returns the model dump, or None if the answer is missing or invalid.
+    """
+    if content is None:
+        return None
+    from pydantic import ValidationError
     try:
-        config = config_handler.load_config()
-        jobs_df = initial_checks(config)
-        if jobs_df is None:
-            sys.exit(1) # Exit if checks fail
+        validated = response_model.model_validate_json(content)
+    except (ValidationError, json.JSONDecodeError) as e:
+        ui_handler.print_warning(f"A batch answer did not match the expected format: {e}")
+        return None
+    ai_handler.cache_response(messages, temperature, content)
+    return validated.model_dump()
 
-        prompts = ai_handler.load_prompts()
-        cv_content = file_handler.read_text_file(config['PATHS']['MASTER_CV_PATH'])
-        html_signature = create_html_signature(config)
-        openai_api_key = config['API_KEYS']['OPENAI_API_KEY']
-    except Exception as e:
-        ui_handler.print_error(f"An error occurred during setup: {e}")
-        sys.exit(1)
+def collect_saved_batch(state, state_path, poll_interval):
+    """
+    Waits for the batch recorded in the state. If the batch failed, it is forgotten so the next run resubmits it.
+    """
+    try:
+        return batch_handler.collect_batch(state['batch_id'], poll_interval)
+    except RuntimeError:
+        state['batch_id'] = None
+        batch_handler.save_state(state_path, state)
+        raise
 
-    # --- 2. User Interaction & Mode Selection ---
-    pending_count = len(jobs_df[jobs_df['Status'].str.lower() == 'pending'])
-    approved_count = len(jobs_df[jobs_df['Status'].str.lower() == 'approved'])
+def process_pending_jobs_in_batch(pending_jobs, prompts, context, state_path, poll_interval, skill_sources=None, known_skills=None):
+    """
+    Runs skill extraction, then email generation, for all 'Pending' jobs as two OpenAI batch jobs.
+    Requests whose answer is already in the response cache are not submitted again.
+    Progress is saved to `state_path` after every step, so an interrupted run resumes where it stopped.
+    `skill_sources` and `known_skills` work as in process_pending_jobs.
+    Returns the same (row index, (extracted_skills, email_contents)) pairs as process_pending_jobs.
+    """
+    skill_sources, known_skills = skill_sources or {}, known_skills or {}
 
-    ui_handler.print_subheader("Current Tracker Status")
-    ui_handler.print_info(f"Found {pending_count} job(s) with 'Pending' status.")
-    ui_handler.print_info(f"Found {approved_count} job(s) with 'Approved' status.")
+    def saved_rows(state):
+        # Only rows recorded in the state file, and still describing the same job, belong to its batch run.
+        return {
+            index: row for index, row in pending_jobs.iterrows()
+            if state['rows'].get(str(index)) == {"job_title": row['Job Title'], "company": row['Company']}
+        }
 
-    if pending_count == 0 and approved_count == 0:
-        ui_handler.print_warning("No jobs to process. Please set a job's status to 'Pending' or 'Approved'.")
-        sys.exit(0)
+    state = batch_handler.load_state(state_path)
+    batch_rows = saved_rows(state) if state else {}
+    if state and (state['phase'] == 'done' or not batch_rows):
+        # A finished batch, or one whose jobs are no longer 'Pending' (e.g. recovered from the journal), is left over from an earlier run.
+        ui_handler.print_info(f"Discarding the finished batch run saved in '{state_path}'.")
+        batch_handler.clear_state(state_path)
+        state = None
+    if state:
+        ui_handler.print_info(f"Resuming the batch run saved in '{state_path}' (phase: {state['phase']}).")
+    else:
+        state = {
+            "phase": "skills",
+            "batch_id": None,
+            "rows": {str(index): {"job_title": row['Job Title'], "company": row['Company']} for index, row in pending_jobs.iterrows()},
+            "skills": {},
+            "emails": {},
+        }
+        batch_handler.save_state(state_path, state)
+        batch_rows = saved_rows(state)
+
+    skipped_count = len(pending_jobs) - len(batch_rows)
+    if skipped_count:
+        ui_handler.print_warning(f"{skipped_count} 'Pending' job(s) are not part of the saved batch and will be processed in a later run.")
+
+    if state['phase'] == 'skills':
+        # Jobs covered by the local skills taxonomy or the response cache, and duplicate jobs, need no batch request.
+        remote_rows = {}
+        cached_count = 0
+        for index, row in batch_rows.items():
+            if index in known_skills:
+                state['skills'][str(index)] = known_skills[index]
+                continue
+            if index in skill_sources:
+                continue
+            local_skills = ai_handler.extract_skills_locally(row.get('Job Description', ''))
+            if local_skills:
+                state['skills'][str(index)] = local_skills
+                continue
+            messages = ai_handler.build_skill_messages(row.get('Job Description', ''), prompts)
+            cached_skills = ai_handler.cached_response(messages, ai_handler.SKILL_TEMPERATURE, ai_handler.Skills)
+            if cached_skills is not None:
+                state['skills'][str(index)] = cached_skills
+                cached_count += 1
+            else:
+                remote_rows[index] = row
+        if cached_count:
+            ui_handler.print_info(f"Loaded skills for {cached_count} job(s) from the AI cache.")
+
+        if remote_rows:
+            if not state['batch_id']:
+                requests = [
+                    batch_handler.build_request(f"skills-{index}", ai_handler.build_skill_messages(row.get('Job Description', ''), prompts), ai_handler.SKILL_TEMPERATURE)
+                    for index, row in remote_rows.items()
+                ]
+                state['batch_id'] = batch_handler.submit_batch(requests)
+                batch_handler.save_state(state_path, state)
+
+            outputs = collect_saved_batch(state, state_path, poll_interval)
+            for index, row in remote_rows.items():
+                messages = ai_handler.build_skill_messages(row.get('Job Description', ''), prompts)
+                state['skills'][str(index)] = validate_batch_output(outputs.get(f"skills-{index}"), ai_handler.Skills, messages, ai_handler.SKILL_TEMPERATURE)
+        for index, source in skill_sources.items():
+            if index in batch_rows:
+                state['skills'][str(index)] = state['skills'].get(str(source))
+        state.update(phase='emails', batch_id=None)
+        batch_handler.save_state(state_path, state)
+        ui_handler.print_success("Skill extraction batch finished.")
+
+    if state['phase'] == 'emails':
+        email_messages = {}
+        for index, row in batch_rows.items():
+            technical_skills, soft_skills = format_skills(state['skills'].get(str(index)), row)
+            contacts = parse_contacts(row)
+            state['emails'][str(index)] = [None] * len(contacts)
+            for i, person in enumerate(contacts):
+                details = build_email_details(row, technical_skills, soft_skills, context, person)
+                messages = ai_handler.build_email_messages(details, prompts)
+                state['emails'][str(index)][i] = ai_handler.cached_response(messages, ai_handler.EMAIL_TEMPERATURE, ai_handler.GeneratedEmail)
+                if state['emails'][str(index)][i] is None:
+                    email_messages[(index, i)] = messages
+        cached_count = sum(len(contacts) for contacts in state['emails'].values()) - len(email_messages)
+        if cached_count:
+            ui_handler.print_info(f"Loaded {cached_count} email(s) from the AI cache.")
+
+        if email_messages:
+            if not state['batch_id']:
+                requests = [
+                    batch_handler.build_request(f"email-{index}-{i}", messages, ai_handler.EMAIL_TEMPERATURE)
+                    for (index, i), messages in email_messages.items()
+                ]
+                state['batch_id'] = batch_handler.submit_batch(requests)
+                batch_handler.save_state(state_path, state)
+
+            outputs = collect_saved_batch(state, state_path, poll_interval)
+            for (index, i), messages in email_messages.items():
+                state['emails'][str(index)][i] = validate_batch_output(outputs.get(f"email-{index}-{i}"), ai_handler.GeneratedEmail, messages, ai_handler.EMAIL_TEMPERATURE)
+        state.update(phase='done', batch_id=None)
+        batch_handler.save_state(state_path, state)
+        ui_handler.print_success("Email generation batch finished.")
+
+    return [(index, (state['skills'].get(str(index)), state['emails'].get(str(index), []))) for index in batch_rows]
+
+def update_row(df, journal, updates, index, changes):
+    """
+    Journals the new values of a row, then queues them for the DataFrame.
+    Queued updates are written in one pass per column by updates.apply(df).
+    """
+    journal.record(index, df.loc[index], changes)
+    updates.set(index, changes)
+
+def send_approved_jobs(df, journal, updates, approved_jobs, outgoing, config, resources):
+    """
+    Sends the queued emails of the 'Approved' jobs in Gmail batches and updates each job's status.
+    `outgoing` maps "<row index>:<contact number>" to a prepared message.
+    Jobs whose emails were held back by Gmail rate limits or connection problems stay 'Approved';
+    only real send errors mark a job 'Failed'.
+    The Gmail service is built on first use and kept in `resources` for later calls.
+    """
+    ui_handler.print_subheader(f"Sending Emails for {len(approved_jobs)} 'Approved' Job(s)")
+    if resources.get('gmail_service') is None:
+        try:
+            resources['gmail_service'] = email_handler.get_gmail_service(config.get('GMAIL', 'API_ENDPOINT', fallback='') or None)
+        except Exception as e:
+            ui_handler.print_error(f"Could not connect to Gmail: {e}")
+    gmail_service = resources.get('gmail_service')
+    if not gmail_service:
+        ui_handler.print_warning("The jobs keep their 'Approved' status and will be sent on the next run.")
+        return
+
+    applied = set()
+    def on_result(request_id, success):
+        index = int(request_id.split(':')[0])
+        if success and index not in applied:
+            # Journal 'Applied' right after the first send, so a crash can never cause a second one.
+            applied.add(index)
+            update_row(df, journal, updates, index, {'Status': 'Applied', 'Application Date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')})
+
+    results = email_handler.send_messages(
+        gmail_service, 'me', outgoing,
+        batch_size=config.getint('GMAIL', 'BATCH_SIZE', fallback=10),
+        max_sends_per_second=config.getfloat('GMAIL', 'MAX_SENDS_PER_SECOND', fallback=2.0),
+        on_result=on_result,
+        rate_limiter=resources.get('gmail_rate_limiter'),
+    )
+    results_by_job = defaultdict(list)
+    for request_id, result in results.items():
+        results_by_job[int(request_id.split(':')[0])].append(result)
+
+    for index in approved_jobs:
+        if index in applied:
+            ui_handler.print_success(f"'{df.at[index, 'Job Title']}': Email(s) sent. Status updated to 'Applied'.")
+        elif results_by_job[index] and all(result is None for result in results_by_job[index]):
+            # Nothing was tried and failed: rate limits or connection problems stopped sending, so the job is sent on a later run.
+            ui_handler.print_warning(f"'{df.at[index, 'Job Title']}': Not sent because of Gmail rate limits or connection problems. The job keeps its 'Approved' status.")
+        else:
+            update_row(df, journal, updates, index, {'Status': 'Failed'})
+            ui_handler.print_error(f"'{df.at[index, 'Job Title']}': Email sending failed. Status updated to 'Failed'.")
+
+def recover_from_journal(journal, excel_path):
+    """
+    Re-applies the changes an interrupted run left in the journal and saves them to the Excel file.
+    Returns True if anything was recovered.
+    """
+    if not journal.has_changes():
+        return False
+    jobs_df = excel_handler.read_excel_file(excel_path)
+    applied, skipped = journal.replay(jobs_df)
+    ui_handler.print_warning(f"Recovered {applied} change(s) from an interrupted run.")
+    if skipped:
+        ui_handler.print_warning(f"{skipped} journaled change(s) no longer match a row in the tracker and were skipped.")
+    excel_handler.write_excel_file(jobs_df, excel_path)
+    journal.clear()
+    # The results of a finished batch run are in the journal, so its state file is no longer needed.
+    batch_state_path = batch_handler.default_state_path(excel_path)
+    batch_state = batch_handler.load_state(batch_state_path)
+    if batch_state and batch_state['phase'] == 'done':
+        batch_handler.clear_state(batch_state_path)
+    return True
+
+def load_resources(config, excel_path, jobs_df):
+    """
+    Loads everything the processing steps need: prompts, CV, signature, the OpenAI client,
+    the response cache and the skills taxonomy. Loaded once and reused for the whole run.
+    """
+    prompts = ai_handler.load_prompts()
+    cv_content = file_handler.read_text_file(config['PATHS']['MASTER_CV_PATH'])
+    # A CV budget of 0 keeps the full CV, so the email prompt prefix stays identical (and cached) across jobs.
+    context = context_handler.ContextCompactor(
+        cv_content,
+        cv_token_budget=config['SETTINGS'].getint('CV_TOKEN_BUDGET', fallback=0),
+        job_description_token_budget=config['SETTINGS'].getint('JOB_DESCRIPTION_TOKEN_BUDGET', fallback=400),
+        index_cache_path=context_handler.default_index_cache_path(excel_path),
+    )
+    html_signature = create_html_signature(config)
+    ai_handler.init_client(
+        config['API_KEYS']['OPENAI_API_KEY'],
+        base_url=config.get('OPENAI', 'BASE_URL', fallback='') or None,
+        timeout=config.getfloat('OPENAI', 'TIMEOUT', fallback=60.0),
+        max_retries=config.getint('OPENAI', 'MAX_RETRIES', fallback=3),
+        stream=config.getboolean('OPENAI', 'STREAM', fallback=True),
+    )
+    # One rate limiter per provider, shared by all workers and kept for the whole run.
+    max_wait = config['SETTINGS'].getfloat('RATE_LIMIT_MAX_WAIT', fallback=600)
+    openai_rate_limiter = rate_limit_handler.RateLimiter(
+        'openai',
+        config.getfloat('OPENAI', 'REQUESTS_PER_MINUTE', fallback=500),
+        config.getfloat('OPENAI', 'TOKENS_PER_MINUTE', fallback=30000),
+        max_wait=max_wait,
+    )
+    ai_handler.set_rate_limiter(openai_rate_limiter)
+    gmail_rate_limiter = rate_limit_handler.RateLimiter('gmail', config.getfloat('GMAIL', 'MAX_SENDS_PER_SECOND', fallback=2.0) * 60, max_wait=max_wait)
+
+    response_cache = None
+    if config.getboolean('CACHE', 'ENABLED', fallback=True):
+        response_cache = cache_handler.ResponseCache(
+            config.get('CACHE', 'PATH', fallback='') or cache_handler.default_cache_path(excel_path),
+            max_size_mb=config.getfloat('CACHE', 'MAX_SIZE_MB', fallback=100),
+            max_age_days=config.getfloat('CACHE', 'MAX_AGE_DAYS', fallback=30),
+        )
+        ai_handler.set_cache(response_cache)
+
+    if config.getboolean('SKILLS', 'LOCAL_EXTRACTION', fallback=True):
+        taxonomy = skills_handler.SkillTaxonomy.load(
+            config.get('SKILLS', 'TAXONOMY_PATH', fallback='skills_taxonomy.yaml'),
+            confidence_threshold=config.getfloat('SKILLS', 'CONFIDENCE_THRESHOLD', fallback=0.6),
+        )
+        learned_count = taxonomy.learn_from_tracker(jobs_df, min_count=config.getint('SKILLS', 'LEARN_MIN_COUNT', fallback=2))
+        if learned_count:
+            ui_handler.print_info(f"Learned {learned_count} new skill(s) from earlier extractions in the tracker.")
+        ai_handler.set_skill_taxonomy(taxonomy)
+
+    duplicate_finder = None
+    if config.getboolean('DEDUP', 'ENABLED', fallback=True):
+        duplicate_finder = dedup_handler.DuplicateFinder(config.getfloat('DEDUP', 'SIMILARITY_THRESHOLD', fallback=0.8))
+
+    # The Gmail service and the message builder are created on first use.
+    return {"prompts": prompts, "context": context, "html_signature": html_signature, "response_cache": response_cache, "duplicate_finder": duplicate_finder, "gmail_rate_limiter": gmail_rate_limiter, "gmail_service": None, "message_builder": None}
+
+def find_duplicate_jobs(df, duplicate_finder):
+    """
+    Returns {row index: representative row index} for the rows whose job description nearly
+    repeats an earlier row of the same company and job title. The representative is the first such row.
+    Postings of one company share much of their text, so different roles are told apart by their title.
+    """
+    if duplicate_finder is None:
+        return {}
+    described = df[df['Job Description'].astype(str).str.strip() != '']
+    with metrics_handler.span('dedup.cluster'):
+        return duplicate_finder.clusters(
+            dict(zip(described.index, described['Job Description'].astype(str))),
+            groups={
+                index: (dedup_handler.normalize_company(company), dedup_handler.normalize_title(title))
+                for index, company, title in zip(described.index, described['Company'], described['Job Title'])
+            },
+        )
+
+def cluster_contacts(df, status_index, rows, statuses):
+    """
+    Returns the contact emails (lower-case) of those `rows` whose status is one of `statuses`.
+    """
+    return {email.lower() for index in rows if status_index.status_of(index) in statuses for email in parse_contact_emails(df.loc[index])}
+
+def process_tracker(jobs_df, status_index, chosen_mode, config, excel_path, journal, resources, rows=None):
+    """
+    Processes the 'Pending' and then the 'Approved' jobs of the tracker and saves the result.
+    With `rows`, only those rows are processed (used by watch mode). Returns the updated DataFrame.
+    """
+    prompts, context, html_signature = resources['prompts'], resources['context'], resources['html_signature']
+    def selected_rows(status):
+        return [index for index in status_index.rows(status) if rows is None or index in rows]
 
-    chosen_mode = ui_handler.get_user_choice(config['SETTINGS']['AUTOMATION_MODE'])
-    
-    # --- 3. Main Processing Loop ---
-    changes_made = False
     df_to_process = jobs_df.copy()
+    updates = status_handler.RowUpdateBuffer(status_index)
+
+    # Near-duplicate jobs reuse the skills of the first copy, and nobody is emailed twice about the same job.
+    duplicate_of = find_duplicate_jobs(df_to_process, resources.get('duplicate_finder'))
+    clusters = dedup_handler.group_by_representative(duplicate_of)
+    for index in selected_rows('pending'):
+        if index not in duplicate_of:
+            continue
+        members = clusters[duplicate_of[index]]
+        representative = df_to_process.loc[members[0]]
+        contacts = {email.lower() for email in parse_contact_emails(df_to_process.loc[index])}
+        # Earlier copies that are being, or have been, emailed.
+        contacted = cluster_contacts(df_to_process, status_index, members[:members.index(index)], ('pending', 'ready to send', 'approved', 'applied'))
+        if contacts and contacts <= contacted:
+            update_row(df_to_process, journal, updates, index, {'Status': 'Duplicate'})
+            ui_handler.print_warning(f"'{df_to_process.at[index, 'Job Title']}' repeats '{representative['Job Title']}' at '{representative['Company']}' (row {members[0] + 2}), which already covers all its contacts. Status updated to 'Duplicate'.")
+        elif contacts & contacted:
+            ui_handler.print_warning(f"'{df_to_process.at[index, 'Job Title']}' repeats row {members[0] + 2}; contacts shared with that row will not be emailed twice.")
 
-    for index, row in df_to_process.iterrows():
-        status = str(row.get('Status', '')).strip().lower()
+    # Phase A: 'Pending' jobs are sent to OpenAI concurrently, then written back in row order.
+    pending_jobs = df_to_process.loc[selected_rows('pending')]
+    skill_sources, known_skills = {}, {}
+    for index in pending_jobs.index:
+        if index in duplicate_of:
+            representative = duplicate_of[index]
+            if representative in pending_jobs.index:
+                skill_sources[index] = representative
+            elif skills_from_row(df_to_process.loc[representative]):
+                known_skills[index] = skills_from_row(df_to_process.loc[representative])
+    if not pending_jobs.empty:
+        ui_handler.print_subheader(f"Processing {len(pending_jobs)} 'Pending' Job(s)")
+        if skill_sources or known_skills:
+            ui_handler.print_info(f"{len(skill_sources) + len(known_skills)} job(s) repeat an earlier job and reuse its skills.")
+        if chosen_mode == 'BATCH':
+            ui_handler.print_info("Submitting the jobs to the OpenAI Batch API. This can take up to 24 hours; it is safe to stop and re-run.")
+            batch_state_path = batch_handler.default_state_path(excel_path)
+            try:
+                results = process_pending_jobs_in_batch(pending_jobs, prompts, context, batch_state_path, config['SETTINGS'].getint('BATCH_POLL_INTERVAL', fallback=60), skill_sources, known_skills)
+            except Exception as e:
+                ui_handler.print_error(f"The batch run could not be completed: {e}")
+                ui_handler.print_info("Progress has been saved. Run the script again in BATCH mode to resume.")
+                sys.exit(1)
+        else:
+            max_workers = max(1, config['SETTINGS'].getint('MAX_CONCURRENT_REQUESTS', fallback=4))
+            ui_handler.print_info(f"Running up to {max_workers} OpenAI request(s) at once.")
+            skill_token_budget = config['SETTINGS'].getint('SKILL_BATCH_TOKEN_BUDGET', fallback=6000)
+            results = process_pending_jobs(pending_jobs, prompts, context, max_workers, skill_token_budget, skill_sources, known_skills)
 
-        if status == 'pending':
-            ui_handler.print_subheader(f"Processing 'Pending' Job: '{row['Job Title']}'")
-            changes_made = True
-            
-            job_description = row.get('Job Description', '')
-            extracted_skills = ai_handler.extract_skills_from_description(openai_api_key, job_description, prompts)
+        for index, (extracted_skills, email_contents) in results:
+            ui_handler.print_subheader(f"Processed 'Pending' Job: '{pending_jobs.at[index, 'Job Title']}'")
+            changes = {}
             if extracted_skills:
-                df_to_process.loc[index, 'Technical Skills'] = ", ".join(extracted_skills.get('technical_skills', []))
-                df_to_process.loc[index, 'Soft Skills'] = ", ".join(extracted_skills.get('soft_skills', []))
+                changes['Technical Skills'] = ", ".join(extracted_skills.get('technical_skills', []))
+                changes['Soft Skills'] = ", ".join(extracted_skills.get('soft_skills', []))
                 ui_handler.print_success("Skills extracted.")
-            
-            contacts = [p.strip() for p in row['Contact Person'].split(',') if p.strip()]
-            if contacts:
-                email_list = []
-                for person in contacts:
-                    details = {"contact_person": person, "job_title": row['Job Title'], "company_name": row['Company'], "platform": row['Platform'], "company_description": row['Company Description'], "job_description": job_description[:1500], "technical_skills": df_to_process.loc[index, 'Technical Skills'], "soft_skills": df_to_process.loc[index, 'Soft Skills'], "cv_content": cv_content}
-                    email_content = ai_handler.generate_email(openai_api_key, details, prompts)
-                    if email_content:
-                        full_email_body = email_content['body'] + html_signature
-                        email_list.append({"subject": email_content['subject'], "body": full_email_body})
-                
-                if email_list:
-                    df_to_process.loc[index, 'Cover Letter/Message'] = json.dumps(email_list, indent=2, ensure_ascii=False)
-                    ui_handler.print_success(f"Generated {len(email_list)} email(s).")
-
-            if chosen_mode == 'REVIEW':
-                df_to_process.loc[index, 'Status'] = 'Ready to Send'
+
+            email_list = [{"subject": email_content['subject'], "body": email_content['body'] + html_signature} for email_content in email_contents if email_content]
+            if email_list:
+                changes['Cover Letter/Message'] = json.dumps(email_list, indent=2, ensure_ascii=False)
+                ui_handler.print_success(f"Generated {len(email_list)} email(s).")
+
+            if parse_contacts(pending_jobs.loc[index]) and not email_list:
+                # E.g. OpenAI kept throttling or the quota ran out: try again on the next run instead of saving an empty job.
+                ui_handler.print_warning("No email could be generated. The job stays 'Pending' and will be retried on the next run.")
+            elif chosen_mode in ('REVIEW', 'BATCH'):
+                changes['Status'] = 'Ready to Send'
                 ui_handler.print_success("Status updated to 'Ready to Send'.")
             elif chosen_mode == 'FULL':
-                df_to_process.loc[index, 'Status'] = 'Approved'
+                changes['Status'] = 'Approved'
                 ui_handler.print_success("Status updated to 'Approved' for immediate sending.")
+            update_row(df_to_process, journal, updates, index, changes)
+
+    # Phase B: 'Approved' jobs (including those just approved in FULL mode) are checked,
+    # then all their emails are sent together through one Gmail service.
+    updates.apply(df_to_process)
+    outgoing = {}
+    approved_jobs = selected_rows('approved')
+    if approved_jobs and resources.get('message_builder') is None:
+        try:
+            resources['message_builder'] = email_handler.MessageBuilder(config['USER_DETAILS']['EMAIL'], config['PATHS']['PDF_CV_PATH'])
+        except (OSError, ValueError) as e:
+            ui_handler.print_error(f"Could not prepare the emails: {e}")
+    message_builder = resources.get('message_builder')
+
+    emailed = {} # Representative row -> addresses already emailed about that job.
+    for index in approved_jobs:
+        row = df_to_process.loc[index]
+        ui_handler.print_subheader(f"Processing 'Approved' Job: '{row['Job Title']}'")
+        
+        contact_emails = parse_contact_emails(row)
+        message_content = row.get('Cover Letter/Message', '')
 
-        if df_to_process.loc[index, 'Status'].strip().lower() == 'approved':
-            ui_handler.print_subheader(f"Processing 'Approved' Job: '{row['Job Title']}'")
-            changes_made = True
-            
-            contact_emails = [e.strip() for e in str(row.get('Contact Email', '')).split(',') if e.strip()]
-            message_content = row.get('Cover Letter/Message', '')
+        if not contact_emails or not message_content:
+            update_row(df_to_process, journal, updates, index, {'Status': 'Failed'})
+            ui_handler.print_warning("Skipping email dispatch due to missing contact email or message content.")
+            continue
 
-            if not contact_emails or not message_content:
-                df_to_process.loc[index, 'Status'] = 'Failed'
-                ui_handler.print_warning("Skipping email dispatch due to missing contact email or message content.")
+        try:
+            cover_letters = json.loads(message_content)
+            if len(contact_emails) != len(cover_letters):
+                update_row(df_to_process, journal, updates, index, {'Status': 'Failed'})
                 continue
+        except json.JSONDecodeError:
+            update_row(df_to_process, journal, updates, index, {'Status': 'Failed'})
+            continue
 
-            gmail_service = email_handler.get_gmail_service()
-            if not gmail_service: continue
+        # Addresses already emailed about a duplicate of this job (earlier runs or this one) are skipped.
+        representative = duplicate_of.get(index, index)
+        if representative in clusters and representative not in emailed:
+            emailed[representative] = cluster_contacts(df_to_process, status_index, clusters[representative], ('applied',))
+        already_emailed = emailed.get(representative, set())
+        new_contacts = [(i, email_address) for i, email_address in enumerate(contact_emails) if email_address.lower() not in already_emailed]
+        if not new_contacts:
+            update_row(df_to_process, journal, updates, index, {'Status': 'Duplicate'})
+            ui_handler.print_warning(f"All contacts were already emailed about this job (row {representative + 2}). Status updated to 'Duplicate'.")
+            continue
+        if len(new_contacts) < len(contact_emails):
+            ui_handler.print_warning(f"Skipping {len(contact_emails) - len(new_contacts)} contact(s) already emailed about this job (row {representative + 2}).")
 
-            try:
-                cover_letters = json.loads(message_content)
-                if len(contact_emails) != len(cover_letters):
-                    df_to_process.loc[index, 'Status'] = 'Failed'
+        if message_builder:
+            queued = 0
+            for i, email_address in new_contacts:
+                try:
+                    outgoing[f"{index}:{i}"] = message_builder.build(email_address, cover_letters[i]['subject'], cover_letters[i]['body'])
+                except ValueError as e:
+                    ui_handler.print_warning(str(e))
                     continue
-            except json.JSONDecodeError:
-                df_to_process.loc[index, 'Status'] = 'Failed'
-                continue
+                already_emailed.add(email_address.lower())
+                queued += 1
+            ui_handler.print_info(f"{queued} email(s) queued for sending.")
 
-            sent_at_least_one = False
-            for i, email_address in enumerate(contact_emails):
-                sender_email = config['USER_DETAILS']['EMAIL']
-                message = email_handler.create_message_with_attachment(sender_email, email_address, cover_letters[i]['subject'], cover_letters[i]['body'], config['PATHS']['PDF_CV_PATH'])
-                
-                if message and email_handler.send_message(gmail_service, 'me', message):
-                    sent_at_least_one = True
-
-            if sent_at_least_one:
-                df_to_process.loc[index, 'Status'] = 'Applied'
-                df_to_process.loc[index, 'Application Date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                ui_handler.print_success("Email(s) sent. Status updated to 'Applied'.")
-            else:
-                df_to_process.loc[index, 'Status'] = 'Failed'
-                ui_handler.print_error("Email sending failed. Status updated to 'Failed'.")
+    approved_jobs = selected_rows('approved')
+    if approved_jobs:
+        send_approved_jobs(df_to_process, journal, updates, approved_jobs, outgoing, config, resources)
 
-    # --- 4. Save Changes ---
-    if changes_made:
-        ui_handler.print_subheader("Saving Changes")
+    # --- Save Changes ---
+    updates.apply(df_to_process)
+    if journal.has_changes():
+        save_tracker(df_to_process, chosen_mode, excel_path, journal)
+    else:
+        ui_handler.print_info("No changes were made in this run.")
+    return df_to_process
+
+def save_tracker(df, chosen_mode, excel_path, journal):
+    """
+    Writes the tracker to the Excel file and empties the journal. Returns True if the file was saved;
+    otherwise the changes stay in the journal.
+    """
+    ui_handler.print_subheader("Saving Changes")
+    try:
+        excel_handler.write_excel_file(df, excel_path)
+        ui_handler.print_success("All changes have been saved to the Excel file.")
+        journal.clear()
+        if chosen_mode == 'BATCH':
+            batch_handler.clear_state(batch_handler.default_state_path(excel_path))
+        return True
+    except Exception as e:
+        ui_handler.print_error(f"An unexpected error occurred while saving the file: {e}")
+        ui_handler.print_info("Your changes are kept in the journal and will be recovered on the next run.")
+        return False
+
+def row_states(df):
+    """
+    Returns {row index: (job title, company, normalized status)}, the part of the tracker watch mode compares.
+    """
+    statuses = df['Status'].astype(str).str.strip().str.lower()
+    return dict(zip(df.index, zip(df['Job Title'], df['Company'], statuses)))
+
+def changed_rows(previous_states, df):
+    """
+    Returns the rows that newly became 'Pending' or 'Approved' (or are new rows with that status) since `previous_states`.
+    """
+    return {
+        index for index, state in row_states(df).items()
+        if state[2] in ('pending', 'approved') and previous_states.get(index) != state
+    }
+
+def watch_tracker(jobs_df, chosen_mode, config, excel_path, journal, resources, poll_interval):
+    """
+    Keeps running and processes the rows whose status newly becomes 'Pending' or 'Approved'.
+    The tracker's modification time is polled; the clients, prompts and CV stay loaded between changes.
+    Changes saved by the assistant itself are not treated as new work. Stops on Ctrl+C.
+    If a save fails, the journaled changes are re-applied to every tracker read afterwards (so jobs
+    already sent are not sent again), and saving is retried on each poll until it succeeds.
+    """
+    ui_handler.print_subheader("Watch Mode")
+    ui_handler.print_info(f"Watching '{excel_path}' for changes every {poll_interval:g}s. Press Ctrl+C to stop.")
+    previous_states = row_states(jobs_df)
+    signature = excel_handler.workbook_signature(excel_path)
+    try:
+        while True:
+            time.sleep(poll_interval)
+            try:
+                previous_states, signature = watch_pass(previous_states, signature, chosen_mode, config, excel_path, journal, resources)
+            except Exception as e:
+                # One failed pass must not stop the watcher. Its changes stay in the journal, and its rows
+                # are looked at again the next time the tracker changes.
+                ui_handler.print_error(f"An error occurred while processing the tracker changes: {e}")
+                ui_handler.print_info("Your changes are kept in the journal. Watching for further changes...")
+    except KeyboardInterrupt:
+        ui_handler.print_info("Watch mode stopped.")
+
+def watch_pass(previous_states, signature, chosen_mode, config, excel_path, journal, resources):
+    """
+    One poll of watch mode: processes the rows that changed since `previous_states`, if the tracker changed.
+    Returns the new (previous_states, signature).
+    """
+    current_signature = excel_handler.workbook_signature(excel_path)
+    if current_signature == signature and not journal.has_changes():
+        return previous_states, signature
+    if not excel_handler.check_file_writable(excel_path):
+        return previous_states, signature # Still open in Excel; check again once it is closed.
+
+    try:
+        jobs_df = excel_handler.read_excel_file(excel_path)
+    except IOError as e:
+        ui_handler.print_warning(f"Could not read the tracker yet ({e}). Trying again...")
+        return previous_states, signature
+    # Changes that could not be saved yet are only in the journal, not in the file.
+    journal.replay(jobs_df)
+    rows = changed_rows(previous_states, jobs_df)
+    if not rows:
+        if journal.has_changes() and save_tracker(jobs_df, chosen_mode, excel_path, journal):
+            current_signature = excel_handler.workbook_signature(excel_path)
+        return row_states(jobs_df), current_signature
+
+    ui_handler.print_info(f"{len(rows)} job(s) changed to 'Pending' or 'Approved'.")
+    status_index = status_handler.StatusIndex(jobs_df['Status'])
+    read_states = row_states(jobs_df)
+    jobs_df = process_tracker(jobs_df, status_index, chosen_mode, config, excel_path, journal, resources, rows)
+    ui_handler.print_info("Waiting for further changes...")
+    if journal.has_changes():
+        return read_states, current_signature
+    # Saved: the assistant's own save is not a change to react to.
+    return row_states(jobs_df), excel_handler.workbook_signature(excel_path)
+
+def print_run_report(config, excel_path, chosen_mode, resources):
+    """
+    Prints the OpenAI usage, cache statistics and stage timings, and appends them to the run reports file.
+    """
+    ui_handler.print_subheader("Run Report")
+    usage = ai_handler.get_usage()
+    estimated_cost = ai_handler.estimate_cost(
+        usage,
+        config.getfloat('OPENAI', 'INPUT_PRICE_PER_MILLION', fallback=2.50),
+        config.getfloat('OPENAI', 'CACHED_INPUT_PRICE_PER_MILLION', fallback=1.25),
+        config.getfloat('OPENAI', 'OUTPUT_PRICE_PER_MILLION', fallback=10.00),
+    )
+    if usage['requests']:
+        cached_share = usage['cached_tokens'] / usage['prompt_tokens'] * 100 if usage['prompt_tokens'] else 0
+        ui_handler.print_info(f"OpenAI usage: {usage['requests']} request(s), {usage['prompt_tokens']} prompt tokens ({usage['cached_tokens']} cached, {cached_share:.0f}%), {usage['completion_tokens']} completion tokens, about ${estimated_cost:.4f}.")
+    response_cache = resources['response_cache']
+    if response_cache:
+        ui_handler.print_info(f"AI cache: {response_cache.hits} hit(s), {response_cache.misses} miss(es).")
+    report = metrics_handler.build_report({"mode": chosen_mode, "estimated_cost_usd": round(estimated_cost, 6)})
+    for line in metrics_handler.format_report(report):
+        ui_handler.print_info(line)
+    try:
+        metrics_handler.append_report(report, metrics_handler.default_report_path(excel_path))
+    except IOError as e:
+        ui_handler.print_warning(str(e))
+
+def print_status(config):
+    """
+    Prints the status counts of the tracker without loading pandas or any API client, for a quick check.
+    """
+    excel_path = config['PATHS']['EXCEL_FILE_PATH']
+    counts = excel_handler.count_statuses(excel_path)
+    ui_handler.print_subheader("Current Tracker Status")
+    ui_handler.print_info(f"Found {counts['pending']} job(s) with 'Pending' status.")
+    ui_handler.print_info(f"Found {counts['approved']} job(s) with 'Approved' status.")
+    others = ", ".join(f"{status}: {count}" for status, count in sorted(counts.items()) if status not in ('pending', 'approved'))
+    if others:
+        ui_handler.print_info(f"Other statuses: {others}.")
+
+    journal_path = journal_handler.default_journal_path(excel_path)
+    if os.path.exists(journal_path):
+        journal = journal_handler.TrackerJournal(journal_path)
+        if journal.has_changes():
+            ui_handler.print_warning("The journal holds changes that are not in the Excel file yet; the counts above may be out of date. Run 'python main.py --export' to save them.")
+        journal.close()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="AI Job Assistant")
+    parser.add_argument('--status', action='store_true', help="Print how many jobs have each status, then exit.")
+    parser.add_argument('--export', action='store_true', help="Save changes left in the journal by an interrupted run to the Excel file, then exit.")
+    parser.add_argument('--mode', choices=['REVIEW', 'FULL', 'BATCH'], type=str.upper, help="Run in this mode without asking (for scheduled or benchmark runs).")
+    parser.add_argument('--watch', action='store_true', help="Keep running and process jobs as soon as their status changes to 'Pending' or 'Approved' (REVIEW or FULL mode).")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    ui_handler.print_header("AI Job Assistant")
+    if args.watch and args.mode == 'BATCH':
+        ui_handler.print_error("Watch mode works with REVIEW or FULL mode only.")
+        sys.exit(1)
+
+    if args.status:
         try:
-            excel_handler.write_excel_file(df_to_process, config['PATHS']['EXCEL_FILE_PATH'])
-            ui_handler.print_success("All changes have been saved to the Excel file.")
+            print_status(config_handler.load_config())
         except Exception as e:
-            ui_handler.print_error(f"An unexpected error occurred while saving the file: {e}")
+            ui_handler.print_error(f"An error occurred while reading the tracker status: {e}")
+            sys.exit(1)
+        sys.exit(0)
+    
+    # --- 1. Initial Setup & Checks ---
+    try:
+        config = config_handler.load_config()
+        excel_path = config['PATHS']['EXCEL_FILE_PATH']
+        status_df = initial_checks(config)
+        if status_df is None:
+            sys.exit(1) # Exit if checks fail
+
+        journal = journal_handler.TrackerJournal(journal_handler.default_journal_path(excel_path))
+        if recover_from_journal(journal, excel_path):
+            status_df = excel_handler.read_excel_file(excel_path, columns=['Status'])
+        if args.export:
+            ui_handler.print_success("The Excel file is up to date with the journal.")
+            journal.close()
+            sys.exit(0)
+    except Exception as e:
+        ui_handler.print_error(f"An error occurred during setup: {e}")
+        sys.exit(1)
+
+    # --- 2. User Interaction & Mode Selection ---
+    status_index = status_handler.StatusIndex(status_df['Status'])
+    pending_count = status_index.count('pending')
+    approved_count = status_index.count('approved')
+
+    ui_handler.print_subheader("Current Tracker Status")
+    ui_handler.print_info(f"Found {pending_count} job(s) with 'Pending' status.")
+    ui_handler.print_info(f"Found {approved_count} job(s) with 'Approved' status.")
+
+    if pending_count == 0 and approved_count == 0 and not args.watch:
+        ui_handler.print_warning("No jobs to process. Please set a job's status to 'Pending' or 'Approved'.")
+        sys.exit(0)
+
+    # The full tracker, prompts, CV and API client are only loaded once there is work to do.
+    try:
+        jobs_df = excel_handler.read_excel_file(excel_path)
+        resources = load_resources(config, excel_path, jobs_df)
+    except Exception as e:
+        ui_handler.print_error(f"An error occurred during setup: {e}")
+        sys.exit(1)
+
+    if args.mode:
+        chosen_mode = args.mode
+        ui_handler.print_success(f"{chosen_mode} mode selected.")
     else:
-        ui_handler.print_info("No changes were made in this run.")
+        chosen_mode = ui_handler.get_user_choice(config['SETTINGS']['AUTOMATION_MODE'])
+    if args.watch and chosen_mode == 'BATCH':
+        ui_handler.print_error("Watch mode works with REVIEW or FULL mode only.")
+        sys.exit(1)
+    
+    # --- 3. Main Processing ---
+    jobs_df = process_tracker(jobs_df, status_index, chosen_mode, config, excel_path, journal, resources)
+
+    # --- 4. Watch Mode ---
+    if args.watch:
+        watch_tracker(jobs_df, chosen_mode, config, excel_path, journal, resources, config['SETTINGS'].getfloat('WATCH_INTERVAL', fallback=5))
 
+    # --- 5. Run Report ---
+    print_run_report(config, excel_path, chosen_mode, resources)
+    if resources['response_cache']:
+        resources['response_cache'].close()
+    journal.close()
+    ai_handler.close_client()
     ui_handler.print_header("AI Job Assistant Finished")
 
 if __name__ == "__main__":
@@ -1,17 +1,29 @@
-import openai
 import json
 import yaml
-from pydantic import BaseModel, Field, ValidationError
-from typing import List
+import random
+import re
+import time
+
+from modules import metrics_handler
+from modules.cache_handler import make_cache_key
+
+MODEL_NAME = "gpt-4o"
+SKILL_TEMPERATURE = 0.2 # ** الإضافة الجديدة: قيمة منخفضة للدقة **
+EMAIL_TEMPERATURE = 0.4 # ** الإضافة الجديدة: قيمة متوازنة للاحترافية **
+MAX_JOBS_PER_SKILL_BATCH = 20
+MAX_STREAMED_CHARS = 20000 # Per email: a multi-contact answer may be that much longer per contact.
+MAX_SUBJECT_LENGTH = 200
 
 # --- Pydantic Models ---
-class Skills(BaseModel):
-    technical_skills: List[str] = Field(description="A list of extracted technical skills.")
-    soft_skills: List[str] = Field(description="A list of extracted soft skills.")
+# The models live in ai_models and are loaded on first access (PEP 562), so importing this
+# module stays fast for runs that never call OpenAI. Inside this module, import them locally.
+MODEL_NAMES = ('Skills', 'SkillsBatch', 'GeneratedEmail', 'ContactEmail', 'ContactEmails')
 
-class GeneratedEmail(BaseModel):
-    subject: str = Field(description="The suggested subject line for the email.")
-    body: str = Field(description="The generated body content of the email.")
+def __getattr__(name):
+    if name in MODEL_NAMES:
+        from modules import ai_models
+        return getattr(ai_models, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # --- Helper function ---
 def load_prompts(file_path='prompts.yaml'):
@@ -23,23 +35,365 @@ def load_prompts(file_path='prompts.yaml'):
     except Exception as e:
         raise IOError(f"Error reading the prompts file: {e}")
 
+# --- Shared OpenAI client ---
+# One client is created per run and reused by every call, so its HTTP connection
+# pool (and the TLS sessions in it) stays alive across requests.
+_client = None
+_max_retries = 3
+_stream = True
+_cache = None
+_taxonomy = None
+_rate_limiter = None
+USAGE_KEYS = ('requests', 'prompt_tokens', 'cached_tokens', 'completion_tokens')
+
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+# Tokens reserved for the answer of a request, until its real usage is known.
+EXPECTED_COMPLETION_TOKENS = 500
+
+def init_client(api_key, base_url=None, timeout=60.0, max_retries=3, stream=True):
+    """
+    Creates the OpenAI client shared by all AI calls in this run.
+    `base_url` can point to a local stub server instead of the OpenAI endpoint.
+    With `stream`, answers are streamed and checked while they arrive (see _stream_completion).
+    """
+    import openai # Imported here: the openai package takes a long time to import.
+    global _client, _max_retries, _stream
+    close_client()
+    # Retries are handled by _create_completion so they can use jittered backoff.
+    _client = openai.OpenAI(api_key=api_key, base_url=base_url or None, timeout=timeout, max_retries=0)
+    _max_retries = max(0, max_retries)
+    _stream = stream
+    return _client
+
+def get_client():
+    if _client is None:
+        raise RuntimeError("The OpenAI client has not been initialized. Call init_client() first.")
+    return _client
+
+def close_client():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+def record_usage(usage):
+    """
+    Adds a response's token usage (an SDK object or a plain dict, as in batch output) to the run totals.
+    """
+    if usage is None:
+        return
+    if not isinstance(usage, dict):
+        usage = usage.model_dump()
+    details = usage.get('prompt_tokens_details') or {}
+    metrics_handler.increment('openai.requests')
+    metrics_handler.increment('openai.prompt_tokens', usage.get('prompt_tokens') or 0)
+    metrics_handler.increment('openai.cached_tokens', details.get('cached_tokens') or 0)
+    metrics_handler.increment('openai.completion_tokens', usage.get('completion_tokens') or 0)
+
+def get_usage():
+    """
+    Returns the token usage of this run: requests, prompt_tokens, cached_tokens and completion_tokens.
+    """
+    return {key: metrics_handler.get_counter(f'openai.{key}') for key in USAGE_KEYS}
+
+def estimate_cost(usage, input_price, cached_input_price, output_price):
+    """
+    Estimates the cost in USD of the given usage, with prices per million tokens.
+    """
+    uncached_tokens = usage['prompt_tokens'] - usage['cached_tokens']
+    return (uncached_tokens * input_price + usage['cached_tokens'] * cached_input_price + usage['completion_tokens'] * output_price) / 1_000_000
+
+def set_cache(cache):
+    """
+    Enables (or, with None, disables) the on-disk response cache for AI calls.
+    """
+    global _cache
+    _cache = cache
+
+def set_skill_taxonomy(taxonomy):
+    """
+    Enables (or, with None, disables) local skill extraction from a skills_handler.SkillTaxonomy.
+    """
+    global _taxonomy
+    _taxonomy = taxonomy
+
+def set_rate_limiter(rate_limiter):
+    """
+    Paces every completion request with a rate_limit_handler.RateLimiter (None disables pacing).
+    """
+    global _rate_limiter
+    _rate_limiter = rate_limiter
+
+def _reserved_tokens(messages):
+    return estimate_tokens(json.dumps(messages, ensure_ascii=False)) + EXPECTED_COMPLETION_TOKENS
+
+def _settle_tokens(messages, usage):
+    """
+    Tells the rate limiter how many tokens a request really used, once its usage is known.
+    """
+    if _rate_limiter is not None and usage is not None:
+        if not isinstance(usage, dict):
+            usage = usage.model_dump()
+        used = (usage.get('prompt_tokens') or 0) + (usage.get('completion_tokens') or 0)
+        _rate_limiter.settle_tokens(_reserved_tokens(messages), used)
+
+def _retry_after(error):
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+def _backoff_delay(attempt, error):
+    """
+    Full-jitter exponential backoff, never shorter than a server-provided Retry-After.
+    """
+    delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+    return max(delay, _retry_after(error) or 0)
+
+def _create_completion(**kwargs):
+    """
+    Sends a chat completion through the shared client, retrying on 429, 5xx and connection errors.
+    With a rate limiter, each request waits for its turn, and a throttled request (429) is queued
+    again behind the limiter without using up a retry, until the limiter's max_wait runs out.
+    A used-up quota makes this and every later request fail right away.
+    """
+    import openai
+    client = get_client()
+    # Without a rate limiter, 429s are retried like server errors.
+    throttled_errors = (openai.RateLimitError,) if _rate_limiter else ()
+    retryable_errors = (openai.InternalServerError, openai.APIConnectionError) + (() if _rate_limiter else (openai.RateLimitError,))
+    reserved_tokens = _reserved_tokens(kwargs['messages'])
+    attempt = 0
+    first_throttled = None
+    while True:
+        if _rate_limiter is not None:
+            _rate_limiter.acquire(tokens=reserved_tokens)
+        try:
+            # The raw response carries the x-ratelimit-* headers.
+            raw_response = client.chat.completions.with_raw_response.create(**kwargs)
+        except throttled_errors as e:
+            _rate_limiter.update_from_headers(e.response.headers)
+            if e.code == 'insufficient_quota':
+                _rate_limiter.exhaust("the OpenAI quota is used up")
+                raise
+            first_throttled = first_throttled or time.monotonic()
+            if time.monotonic() - first_throttled > _rate_limiter.max_wait:
+                raise
+            _rate_limiter.on_throttled(_retry_after(e))
+            metrics_handler.increment('openai.requeued')
+            rate = _rate_limiter.rate()
+            print("OpenAI rate limit reached. The request is queued again" + (f" (now {rate:.0f} requests/min)..." if rate else "..."))
+            continue
+        except retryable_errors as e:
+            if attempt == _max_retries:
+                raise
+            delay = _backoff_delay(attempt, e)
+            attempt += 1
+            metrics_handler.increment('openai.retries')
+            print(f"OpenAI request failed ({type(e).__name__}). Retrying in {delay:.1f}s ({attempt}/{_max_retries})...")
+            time.sleep(delay)
+            continue
+        if _rate_limiter is not None:
+            _rate_limiter.update_from_headers(raw_response.headers)
+            _rate_limiter.on_success()
+        return raw_response.parse()
+
+def _lookup_cache(messages, temperature, response_model):
+    """
+    Returns the validated cached answer for these messages, or None.
+    """
+    from modules.ai_models import ValidationError
+    if _cache is None:
+        return None
+    cached_content = _cache.get(make_cache_key(MODEL_NAME, temperature, messages))
+    if cached_content is None:
+        return None
+    try:
+        return response_model.model_validate_json(cached_content)
+    except ValidationError:
+        return None # Stale entry from an older schema; the caller fetches a fresh answer.
+
+class MalformedStreamError(ValueError):
+    """
+    Raised when a streamed answer is cancelled because it can no longer become a valid response.
+    """
+
+_SUBJECT_PATTERN = re.compile(r'"subject"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+def _check_partial_json(content, checked_subjects=0, max_chars=MAX_STREAMED_CHARS):
+    """
+    Checks the part of a JSON answer received so far and raises MalformedStreamError if it is
+    already invalid or longer than `max_chars`. Every "subject" value is validated as soon as its
+    closing quote arrives. Returns the number of subjects checked, to be passed back in with the next part.
+    """
+    stripped = content.lstrip()
+    if stripped and not stripped.startswith('{'):
+        raise MalformedStreamError("the answer is not a JSON object")
+    if len(content) > max_chars:
+        raise MalformedStreamError(f"the answer is longer than {max_chars} characters")
+
+    subjects = _SUBJECT_PATTERN.findall(content)
+    for raw_subject in subjects[checked_subjects:]:
+        subject = json.loads(f'"{raw_subject}"').strip()
+        if not subject or len(subject) > MAX_SUBJECT_LENGTH or '\n' in subject or '<' in subject:
+            raise MalformedStreamError(f"invalid subject line {subject[:60]!r}")
+    return len(subjects)
+
+def _stream_completion(messages, temperature, on_progress=None, max_chars=MAX_STREAMED_CHARS):
+    """
+    Streams a JSON completion and returns its content. The answer is checked as it arrives, and the
+    request is cancelled (closing the connection, so no more tokens are generated) once it is malformed
+    or longer than `max_chars`. `on_progress` is called with the number of tokens received so far.
+    """
+    started = time.perf_counter()
+    stream = _create_completion(
+        model=MODEL_NAME,
+        messages=messages,
+        response_format={"type": "json_object"},
+        temperature=temperature,
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    content = ""
+    token_count = 0
+    checked_subjects = 0
+    try:
+        for chunk in stream:
+            if chunk.usage:
+                record_usage(chunk.usage)
+                _settle_tokens(messages, chunk.usage)
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            content += chunk.choices[0].delta.content
+            token_count += 1 # Each content chunk carries one token.
+            if token_count == 1:
+                metrics_handler.record('openai.first_token', time.perf_counter() - started)
+            checked_subjects = _check_partial_json(content, checked_subjects, max_chars)
+            if on_progress:
+                on_progress(token_count)
+    except MalformedStreamError:
+        record_usage({'completion_tokens': token_count}) # The final usage chunk never arrives.
+        raise
+    finally:
+        stream.close()
+    return content
+
+def _complete_json(messages, temperature, response_model, action, on_progress=None, max_chars=MAX_STREAMED_CHARS):
+    """
+    Returns the validated response for these messages, served from the response cache when possible.
+    The second return value tells whether the answer came from the cache.
+    A streamed answer longer than `max_chars` is cancelled.
+    """
+    cached = _lookup_cache(messages, temperature, response_model)
+    if cached is not None:
+        return cached, True
+
+    print(f"Connecting to OpenAI to {action}...")
+    metrics_handler.increment('openai.bytes_sent', len(json.dumps(messages, ensure_ascii=False).encode('utf-8')))
+    with metrics_handler.span('openai.completion'):
+        if _stream:
+            content = _stream_completion(messages, temperature, on_progress, max_chars)
+        else:
+            response = _create_completion(
+                model=MODEL_NAME,
+                messages=messages,
+                response_format={"type": "json_object"},
+                temperature=temperature
+            )
+            record_usage(response.usage)
+            _settle_tokens(messages, response.usage)
+            content = response.choices[0].message.content
+    validated = response_model.model_validate_json(content)
+    cache_response(messages, temperature, content)
+    return validated, False
+
+def cached_response(messages, temperature, response_model):
+    """
+    Returns the cached answer (as a dict) for a request sent outside _complete_json (e.g. in a batch job), or None.
+    """
+    cached = _lookup_cache(messages, temperature, response_model)
+    return cached.model_dump() if cached is not None else None
+
+def cache_response(messages, temperature, content):
+    """
+    Stores a response obtained outside _complete_json (e.g. from a batch job) in the response cache.
+    """
+    if _cache is not None:
+        _cache.set(make_cache_key(MODEL_NAME, temperature, messages), content)
+
+# --- Prompt builders ---
+def build_skill_messages(job_description, prompts):
+    prompt_template = prompts['skill_extraction']['user_prompt']
+    system_message = prompts['skill_extraction']['system_message']
+    formatted_prompt = prompt_template.format(job_description=job_description)
+    return [{"role": "system", "content": system_message}, {"role": "user", "content": formatted_prompt}]
+
+def build_skill_batch_messages(descriptions, prompts):
+    """
+    Packs several job descriptions into one request. Each description is labelled with its key as the job ID.
+    """
+    prompt_template = prompts['batch_skill_extraction']['user_prompt']
+    system_message = prompts['batch_skill_extraction']['system_message']
+    job_descriptions = "\n\n".join(f"### Job ID: {key}\n{description}" for key, description in descriptions.items())
+    formatted_prompt = prompt_template.format(job_descriptions=job_descriptions)
+    return [{"role": "system", "content": system_message}, {"role": "user", "content": formatted_prompt}]
+
+def build_email_prefix(cv_content, prompts):
+    """
+    The system message shared by every email of a run: role, instructions and the full CV.
+    It is byte-identical across calls, so it forms a cacheable prompt prefix.
+    """
+    email_prompts = prompts['email_generation']
+    return "\n\n".join([
+        email_prompts['system_message'].strip(),
+        email_prompts['instructions'].strip(),
+        email_prompts['cv_block'].format(cv_content=cv_content).strip(),
+    ])
+
+def build_email_messages(job_details, prompts):
+    prompt_template = prompts['email_generation']['user_prompt']
+    system_message = build_email_prefix(job_details['cv_content'], prompts)
+    formatted_prompt = prompt_template.format(**job_details)
+    return [{"role": "system", "content": system_message}, {"role": "user", "content": formatted_prompt}]
+
+def build_multi_email_messages(job_details, contacts, prompts):
+    """
+    Asks for one email per contact in a single request. The system message is the same
+    cacheable prefix used by build_email_messages.
+    """
+    prompt_template = prompts['multi_email_generation']['user_prompt']
+    system_message = build_email_prefix(job_details['cv_content'], prompts)
+    contact_people = "\n".join(f"- {person}" for person in contacts)
+    formatted_prompt = prompt_template.format(**{**job_details, 'contact_people': contact_people})
+    return [{"role": "system", "content": system_message}, {"role": "user", "content": formatted_prompt}]
+
 # --- AI interaction functions ---
-def extract_skills_from_description(api_key, job_description, prompts):
-    print("Connecting to OpenAI to extract skills...")
+def extract_skills_locally(job_description):
+    """
+    Returns the skills found by the local taxonomy, or None if it is disabled or not confident enough.
+    """
+    if _taxonomy is None:
+        return None
+    with metrics_handler.span('skills.local'):
+        skills = _taxonomy.extract(job_description)
+    if skills:
+        metrics_handler.increment('skills.local_hits')
+        print("Extracted skills locally from the skills taxonomy.")
+    return skills
+
+def extract_skills_from_description(job_description, prompts):
+    from modules.ai_models import Skills, ValidationError
+    local_skills = extract_skills_locally(job_description)
+    if local_skills:
+        return local_skills
     try:
-        client = openai.OpenAI(api_key=api_key)
-        prompt_template = prompts['skill_extraction']['user_prompt']
-        system_message = prompts['skill_extraction']['system_message']
-        formatted_prompt = prompt_template.format(job_description=job_description)
-        
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "system", "content": system_message}, {"role": "user", "content": formatted_prompt}],
-            response_format={"type": "json_object"},
-            temperature=0.2 # ** الإضافة الجديدة: قيمة منخفضة للدقة **
-        )
-        validated_skills = Skills.model_validate_json(response.choices[0].message.content)
-        print("Successfully extracted and validated skills from OpenAI.")
+        messages = build_skill_messages(job_description, prompts)
+        validated_skills, from_cache = _complete_json(messages, SKILL_TEMPERATURE, Skills, "extract skills")
+        print("Loaded skills from the AI cache." if from_cache else "Successfully extracted and validated skills from OpenAI.")
         return validated_skills.model_dump()
     except (ValidationError, json.JSONDecodeError) as e:
         print(f"Pydantic/JSON Validation Error: The AI response did not match the expected format. {e}")
@@ -48,26 +402,130 @@ def extract_skills_from_description(api_key, job_description, prompts):
         print(f"An error occurred while interacting with OpenAI: {e}")
         return None
 
-def generate_email(api_key, job_details, prompts):
-    print("Connecting to OpenAI to generate email...")
+def estimate_tokens(text):
+    """
+    A rough token count (about four characters per token) used for request packing.
+    """
+    return len(text) // 4 + 1
+
+def pack_descriptions(descriptions, token_budget, max_jobs=MAX_JOBS_PER_SKILL_BATCH):
+    """
+    Splits {key: job description} into groups whose descriptions fit within `token_budget` tokens.
+    A description larger than the budget gets a group of its own.
+    """
+    groups = []
+    current, current_tokens = {}, 0
+    for key, description in descriptions.items():
+        tokens = estimate_tokens(description)
+        if current and (current_tokens + tokens > token_budget or len(current) >= max_jobs):
+            groups.append(current)
+            current, current_tokens = {}, 0
+        current[key] = description
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+def extract_skills_batch(descriptions, prompts):
+    """
+    Extracts skills for several job descriptions with a single request.
+    Returns {key: skills dict or None}. Descriptions already in the cache are not sent again.
+    """
+    from modules.ai_models import Skills
+    if len(descriptions) == 1:
+        return _extract_skills_group(descriptions, prompts)
+
+    results, uncached = {}, {}
+    for key, description in descriptions.items():
+        cached = _lookup_cache(build_skill_messages(description, prompts), SKILL_TEMPERATURE, Skills)
+        if cached is not None:
+            results[key] = cached.model_dump()
+        else:
+            uncached[key] = description
+    if results:
+        print(f"Loaded skills for {len(results)} job(s) from the AI cache.")
+
+    results.update(_extract_skills_group(uncached, prompts))
+    return results
+
+def _extract_skills_group(descriptions, prompts):
+    """
+    Sends one batched extraction request. If the answer fails validation or misses a job,
+    the group is split in half and each half is retried; single jobs use the regular request.
+    """
+    from modules.ai_models import SkillsBatch, ValidationError
+    if not descriptions:
+        return {}
+    keys = list(descriptions)
+    if len(keys) == 1:
+        return {keys[0]: extract_skills_from_description(descriptions[keys[0]], prompts)}
+
     try:
-        client = openai.OpenAI(api_key=api_key)
-        prompt_template = prompts['email_generation']['user_prompt']
-        system_message = prompts['email_generation']['system_message']
-        formatted_prompt = prompt_template.format(**job_details)
-
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "system", "content": system_message}, {"role": "user", "content": formatted_prompt}],
-            response_format={"type": "json_object"},
-            temperature=0.4 # ** الإضافة الجديدة: قيمة متوازنة للاحترافية **
-        )
-        validated_email = GeneratedEmail.model_validate_json(response.choices[0].message.content)
-        print("Successfully generated and validated email from OpenAI.")
+        messages = build_skill_batch_messages(descriptions, prompts)
+        validated_batch, _ = _complete_json(messages, SKILL_TEMPERATURE, SkillsBatch, f"extract skills for {len(keys)} jobs")
+        missing_keys = [str(key) for key in keys if str(key) not in validated_batch.results]
+        if missing_keys:
+            raise ValueError(f"no skills returned for job ID(s) {', '.join(missing_keys)}")
+    except (ValidationError, json.JSONDecodeError, ValueError) as e:
+        print(f"Batched skill extraction for {len(keys)} jobs failed validation ({e}). Splitting and retrying...")
+        half = len(keys) // 2
+        return {
+            **_extract_skills_group({key: descriptions[key] for key in keys[:half]}, prompts),
+            **_extract_skills_group({key: descriptions[key] for key in keys[half:]}, prompts),
+        }
+    except Exception as e:
+        print(f"An error occurred while interacting with OpenAI: {e}")
+        return {key: None for key in keys}
+
+    results = {}
+    for key in keys:
+        skills = validated_batch.results[str(key)]
+        # Store each job's answer under its single-job prompt too, so later runs hit the cache however jobs are grouped.
+        cache_response(build_skill_messages(descriptions[key], prompts), SKILL_TEMPERATURE, skills.model_dump_json())
+        results[key] = skills.model_dump()
+    print(f"Successfully extracted and validated skills for {len(keys)} jobs in one request.")
+    return results
+
+def generate_email(job_details, prompts, on_progress=None):
+    from modules.ai_models import GeneratedEmail, ValidationError
+    try:
+        messages = build_email_messages(job_details, prompts)
+        validated_email, from_cache = _complete_json(messages, EMAIL_TEMPERATURE, GeneratedEmail, "generate email", on_progress)
+        print("Loaded email from the AI cache." if from_cache else "Successfully generated and validated email from OpenAI.")
         return validated_email.model_dump()
+    except MalformedStreamError as e:
+        print(f"Cancelled email generation because the answer was malformed: {e}")
+        return None
     except (ValidationError, json.JSONDecodeError) as e:
         print(f"Pydantic/JSON Validation Error for email generation: {e}")
         return None
     except Exception as e:
         print(f"An error occurred during email generation with OpenAI: {e}")
         return None
+
+def generate_emails_for_contacts(job_details, contacts, prompts, on_progress=None):
+    """
+    Generates the emails for all contacts of a job with one request.
+    Returns a list aligned with `contacts` (None for a failed email). If the combined answer is
+    invalid or does not cover every contact exactly once, each contact gets its own request instead.
+    `on_progress` is called with the number of tokens streamed so far for the current request.
+    """
+    from modules.ai_models import ContactEmails, GeneratedEmail, ValidationError
+    if len(contacts) <= 1:
+        return [generate_email({**job_details, 'contact_person': person}, prompts, on_progress) for person in contacts]
+
+    try:
+        messages = build_multi_email_messages(job_details, contacts, prompts)
+        validated_emails, from_cache = _complete_json(
+            messages, EMAIL_TEMPERATURE, ContactEmails, f"generate {len(contacts)} emails", on_progress, MAX_STREAMED_CHARS * len(contacts)
+        )
+        emails_by_contact = {email.contact_person.strip().lower(): email for email in validated_emails.emails}
+        if len(emails_by_contact) != len(validated_emails.emails) or set(emails_by_contact) != {person.lower() for person in contacts}:
+            raise ValueError("the emails do not match the contact people one-to-one")
+        print(f"Loaded {len(contacts)} emails from the AI cache." if from_cache else f"Successfully generated and validated {len(contacts)} emails in one request.")
+        return [GeneratedEmail(**emails_by_contact[person.lower()].model_dump(exclude={'contact_person'})).model_dump() for person in contacts]
+    except (ValidationError, json.JSONDecodeError, ValueError) as e:
+        print(f"Multi-contact email generation failed validation ({e}). Generating one email per contact instead...")
+    except Exception as e:
+        print(f"An error occurred during email generation with OpenAI: {e}. Generating one email per contact instead...")
+    return [generate_email({**job_details, 'contact_person': person}, prompts, on_progress) for person in contacts]
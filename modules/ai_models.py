@@ -0,0 +1,21 @@
+# This module defines the Pydantic models for the AI responses.
+# It is imported on first use (see ai_handler.__getattr__), because importing pydantic is slow.
+from pydantic import BaseModel, Field, ValidationError
+from typing import Dict, List
+
+class Skills(BaseModel):
+    technical_skills: List[str] = Field(description="A list of extracted technical skills.")
+    soft_skills: List[str] = Field(description="A list of extracted soft skills.")
+
+class SkillsBatch(BaseModel):
+    results: Dict[str, Skills] = Field(description="The extracted skills for each job, keyed by its job ID.")
+
+class GeneratedEmail(BaseModel):
+    subject: str = Field(description="The suggested subject line for the email.")
+    body: str = Field(description="The generated body content of the email.")
+
+class ContactEmail(GeneratedEmail):
+    contact_person: str = Field(description="The contact person this email is addressed to.")
+
+class ContactEmails(BaseModel):
+    emails: List[ContactEmail] = Field(description="One generated email for each contact person of the job.")
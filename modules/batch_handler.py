@@ -0,0 +1,111 @@
+# This module sends AI requests through the OpenAI Batch API and keeps a resumable local state file.
+import json
+import os
+import time
+
+from modules import ai_handler, metrics_handler
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+COMPLETION_WINDOW = "24h"
+FINAL_FAILURE_STATUSES = ('failed', 'expired', 'cancelled')
+
+# --- State file ---
+def default_state_path(excel_path):
+    """
+    Keeps the batch state next to the tracker file.
+    """
+    return os.path.join(os.path.dirname(excel_path), 'batch_state.json')
+
+def load_state(state_path):
+    if not os.path.exists(state_path):
+        return None
+    try:
+        with open(state_path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError) as e:
+        raise IOError(f"Error reading the batch state file '{state_path}': {e}")
+
+def save_state(state_path, state):
+    """
+    Writes the state atomically so a crash never leaves a half-written file behind.
+    """
+    temp_path = state_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(state, file, indent=2, ensure_ascii=False)
+    os.replace(temp_path, state_path)
+
+def clear_state(state_path):
+    if os.path.exists(state_path):
+        os.remove(state_path)
+
+# --- Batch API ---
+def build_request(custom_id, messages, temperature):
+    """
+    Builds one JSONL line of a batch input file.
+    """
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": {
+            "model": ai_handler.MODEL_NAME,
+            "messages": messages,
+            "response_format": {"type": "json_object"},
+            "temperature": temperature,
+        },
+    }
+
+@metrics_handler.timed('openai.batch_submit')
+def submit_batch(requests):
+    """
+    Uploads the requests as a JSONL file and starts a batch job. Returns the batch ID.
+    """
+    client = ai_handler.get_client()
+    payload = "\n".join(json.dumps(request, ensure_ascii=False) for request in requests).encode('utf-8')
+    input_file = client.files.create(file=("batch_input.jsonl", payload), purpose="batch")
+    batch = client.batches.create(input_file_id=input_file.id, endpoint=BATCH_ENDPOINT, completion_window=COMPLETION_WINDOW)
+    print(f"Submitted batch '{batch.id}' with {len(requests)} request(s).")
+    return batch.id
+
+@metrics_handler.timed('openai.batch_wait')
+def wait_for_batch(batch_id, poll_interval=60):
+    """
+    Polls the batch until it finishes. Raises RuntimeError if it failed, expired or was cancelled.
+    """
+    client = ai_handler.get_client()
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status == 'completed':
+            return batch
+        if batch.status in FINAL_FAILURE_STATUSES:
+            raise RuntimeError(f"Batch '{batch_id}' ended with status '{batch.status}'.")
+
+        counts = batch.request_counts
+        progress = f"{counts.completed}/{counts.total}" if counts else "?"
+        print(f"Batch '{batch_id}' is '{batch.status}' ({progress} done). Checking again in {poll_interval}s...")
+        time.sleep(poll_interval)
+
+def download_results(batch):
+    """
+    Returns a dict mapping each successful request's custom_id to the raw message content.
+    """
+    if not batch.output_file_id:
+        return {}
+
+    client = ai_handler.get_client()
+    results = {}
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        response = item.get('response') or {}
+        if response.get('status_code') == 200:
+            ai_handler.record_usage(response['body'].get('usage'))
+            results[item['custom_id']] = response['body']['choices'][0]['message']['content']
+    return results
+
+def collect_batch(batch_id, poll_interval=60):
+    """
+    Waits for a submitted batch and returns its contents by custom_id.
+    """
+    return download_results(wait_for_batch(batch_id, poll_interval))
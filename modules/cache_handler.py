@@ -0,0 +1,88 @@
+# This module stores AI responses on disk so unchanged prompts are never paid for twice.
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+def make_cache_key(model, temperature, messages):
+    """
+    Builds a content-addressed key from everything that determines the model's answer.
+    """
+    payload = json.dumps({"model": model, "temperature": temperature, "messages": messages}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class ResponseCache:
+    """
+    A small SQLite key-value store for raw AI responses, with size- and age-based eviction.
+    Safe to share between the worker threads of a single run.
+    """
+
+    def __init__(self, db_path, max_size_mb=100, max_age_days=30):
+        self.db_path = db_path
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.max_age_seconds = max_age_days * 24 * 60 * 60
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        try:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+        except sqlite3.Error as e:
+            raise IOError(f"Could not open the AI cache at '{db_path}': {e}")
+        self.evict()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            now = time.time()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, value):
+        with self._lock:
+            now = time.time()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+
+    def evict(self):
+        """
+        Drops expired entries, then the least recently used ones until the cache fits its size limit.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.max_age_seconds,))
+            total = self._conn.execute("SELECT COALESCE(SUM(LENGTH(CAST(value AS BLOB))), 0) FROM responses").fetchone()[0]
+            excess = total - self.max_bytes
+            if excess <= 0:
+                return
+
+            stale_keys = []
+            for key, size in self._conn.execute("SELECT key, LENGTH(CAST(value AS BLOB)) FROM responses ORDER BY last_used"):
+                if excess <= 0:
+                    break
+                stale_keys.append((key,))
+                excess -= size
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+
+    def close(self):
+        self.evict()
+        with self._lock:
+            self._conn.close()
+
+def default_cache_path(excel_path):
+    """
+    Keeps the cache next to the tracker file unless a path is configured.
+    """
+    return os.path.join(os.path.dirname(excel_path), 'ai_cache.sqlite3')
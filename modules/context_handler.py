@@ -0,0 +1,210 @@
+# This module trims the CV and job description in each prompt down to the parts relevant to the job.
+import hashlib
+import json
+import math
+import os
+import re
+from collections import Counter
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have', 'in', 'is', 'it', 'its',
+    'of', 'on', 'or', 'our', 'that', 'the', 'their', 'this', 'to', 'we', 'will', 'with', 'you', 'your',
+}
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# --- Tokens ---
+_encoding = None
+
+def _get_encoding():
+    """
+    Returns the local tiktoken encoding for the model, or False if tiktoken (or its data) is unavailable.
+    """
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.encoding_for_model("gpt-4o")
+        except Exception:
+            _encoding = False
+    return _encoding
+
+def count_tokens(text):
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text))
+    return len(text) // 4 + 1 # Roughly four characters per token.
+
+def trim_to_tokens(text, token_budget):
+    """
+    Cuts the text down to about `token_budget` tokens (at least one word), ending at a word boundary where possible.
+    """
+    text = text.strip()
+    if count_tokens(text) <= token_budget:
+        return text
+    encoding = _get_encoding()
+    if encoding:
+        trimmed = encoding.decode(encoding.encode(text)[:max(token_budget, 1)], errors='ignore')
+    else:
+        trimmed = text[:max(token_budget - 1, 1) * 4]
+    if len(trimmed) < len(text) and not text[len(trimmed)].isspace():
+        # The cut falls inside a word: drop that word, unless it is the only one.
+        words = trimmed.rsplit(None, 1)
+        if len(words) > 1:
+            trimmed = words[0]
+    return trimmed.rstrip()
+
+def terms(text):
+    """
+    Lower-cased search terms of a text, keeping tokens like 'c++', 'c#' and 'node.js' intact.
+    """
+    words = (word.strip('.') for word in re.findall(r"[a-z0-9][a-z0-9+#.]*", text.lower()))
+    return [word for word in words if word and word not in STOPWORDS]
+
+# --- BM25 ---
+class BM25Index:
+    """
+    A small BM25 index over a list of passages.
+    """
+
+    def __init__(self, term_counts):
+        self.term_counts = [Counter(counts) for counts in term_counts]
+        self.lengths = [sum(counts.values()) for counts in self.term_counts]
+        self.average_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0
+        document_frequency = Counter(term for counts in self.term_counts for term in counts)
+        total = len(self.term_counts)
+        self.idf = {term: math.log(1 + (total - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()}
+
+    @classmethod
+    def from_passages(cls, passages):
+        return cls([Counter(terms(passage)) for passage in passages])
+
+    def scores(self, query_terms):
+        results = []
+        for counts, length in zip(self.term_counts, self.lengths):
+            score = 0.0
+            for term in set(query_terms):
+                frequency = counts.get(term, 0)
+                if frequency:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (self.average_length or 1))
+                    score += self.idf[term] * frequency * (BM25_K1 + 1) / (frequency + norm)
+            results.append(score)
+        return results
+
+def select_passages(passages, scores, token_budget, keep_first=False):
+    """
+    Picks the highest-scoring passages that fit in `token_budget` tokens and returns them in their original order.
+    If not even one passage fits, the best one is trimmed to the budget, so some text is always returned.
+    """
+    chosen = set()
+    used = 0
+    if keep_first and passages:
+        chosen.add(0)
+        used = count_tokens(passages[0])
+    for position in sorted(range(len(passages)), key=lambda i: scores[i], reverse=True):
+        if position in chosen:
+            continue
+        tokens = count_tokens(passages[position])
+        if used + tokens <= token_budget:
+            chosen.add(position)
+            used += tokens
+    if not chosen and passages:
+        best = max(range(len(passages)), key=lambda i: scores[i])
+        return [trim_to_tokens(passages[best], token_budget)]
+    return [passages[i] for i in sorted(chosen)]
+
+# --- CV and job description ---
+def split_markdown_sections(markdown):
+    """
+    Splits a Markdown document into sections, each starting at a heading.
+    Text before the first heading (usually the name and contact details) is the first section.
+    """
+    sections, current = [], []
+    for line in markdown.splitlines():
+        if line.lstrip().startswith('#') and current:
+            sections.append("\n".join(current).strip())
+            current = []
+        current.append(line)
+    if current:
+        sections.append("\n".join(current).strip())
+    return [section for section in sections if section]
+
+def split_passages(text):
+    """
+    Splits a job description into paragraphs or bullet lines, so passages never cut a word in half.
+    """
+    return [line.strip() for line in re.split(r"\n\s*\n|\n(?=\s*[-*•\d])", text) if line.strip()]
+
+def split_oversized_passages(passages, token_budget):
+    """
+    Splits passages longer than `token_budget` tokens into sentences, and trims sentences that are still too long,
+    so the relevant sentences of a long paragraph can still be picked.
+    """
+    results = []
+    for passage in passages:
+        if count_tokens(passage) <= token_budget:
+            results.append(passage)
+            continue
+        for sentence in re.split(r"(?<=[.!?;])\s+", passage):
+            if sentence.strip():
+                results.append(trim_to_tokens(sentence, token_budget))
+    return results
+
+class ContextCompactor:
+    """
+    Builds the job-specific CV and job description text for email prompts.
+    The CV is split into Markdown sections and indexed once; the index is also cached on disk,
+    keyed by the CV's hash. A budget of 0 keeps the full text.
+    """
+
+    def __init__(self, cv_content, cv_token_budget=0, job_description_token_budget=400, index_cache_path=None):
+        self.cv_content = cv_content
+        self.cv_token_budget = cv_token_budget
+        self.job_description_token_budget = job_description_token_budget
+        self.cv_sections = split_markdown_sections(cv_content)
+        self.cv_index = self._load_cv_index(index_cache_path) if cv_token_budget > 0 else None
+
+    def _load_cv_index(self, cache_path):
+        cv_hash = hashlib.sha256(self.cv_content.encode('utf-8')).hexdigest()
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as file:
+                    cached = json.load(file)
+                if cached.get('cv_hash') == cv_hash:
+                    return BM25Index(cached['term_counts'])
+            except (OSError, ValueError, KeyError):
+                pass # Rebuild a damaged cache below.
+
+        term_counts = [Counter(terms(section)) for section in self.cv_sections]
+        if cache_path:
+            try:
+                with open(cache_path, 'w', encoding='utf-8') as file:
+                    json.dump({'cv_hash': cv_hash, 'term_counts': term_counts}, file)
+            except OSError:
+                pass # The cache is only an optimization.
+        return BM25Index(term_counts)
+
+    def compact_cv(self, query):
+        """
+        Returns the CV sections most relevant to `query` (e.g. job title and skills) within the CV budget.
+        """
+        if not self.cv_index or count_tokens(self.cv_content) <= self.cv_token_budget:
+            return self.cv_content
+        scores = self.cv_index.scores(terms(query))
+        return "\n\n".join(select_passages(self.cv_sections, scores, self.cv_token_budget, keep_first=True))
+
+    def compact_job_description(self, job_description, query):
+        """
+        Returns the job description passages most relevant to `query` within the job description budget.
+        """
+        if self.job_description_token_budget <= 0 or count_tokens(job_description) <= self.job_description_token_budget:
+            return job_description
+        passages = split_oversized_passages(split_passages(job_description), self.job_description_token_budget)
+        scores = BM25Index.from_passages(passages).scores(terms(query))
+        return "\n".join(select_passages(passages, scores, self.job_description_token_budget))
+
+def default_index_cache_path(excel_path):
+    """
+    Keeps the CV index next to the tracker file.
+    """
+    return os.path.join(os.path.dirname(excel_path), 'cv_index.json')
@@ -0,0 +1,151 @@
+# This module finds near-duplicate jobs in the tracker, e.g. the same posting cross-posted on
+# several platforms or added twice, so their skills are extracted once and nobody is emailed twice.
+import re
+import zlib
+from collections import defaultdict
+
+SHINGLE_SIZE = 3
+# 64 MinHash values in 16 bands of 4: pairs with a similarity of 0.8 share a band with a
+# probability above 99.9%, while pairs below 0.3 rarely become candidates.
+NUM_PERMUTATIONS = 64
+BANDS = 16
+# Hash values stay below this prime, so a * hash + b fits in 64 bits.
+_PRIME = (1 << 31) - 1
+COMPANY_SUFFIXES = {'inc', 'ltd', 'llc', 'gmbh', 'corp', 'corporation', 'co', 'company', 'plc', 'sa', 'ag', 'bv', 'limited'}
+
+def normalize_company(name):
+    """
+    Lower-cases the company name and drops punctuation and legal suffixes, e.g. 'Acme, Inc.' -> 'acme'.
+    """
+    words = re.findall(r'\w+', str(name).lower())
+    while len(words) > 1 and words[-1] in COMPANY_SUFFIXES:
+        words.pop()
+    return ' '.join(words)
+
+def normalize_title(title):
+    """
+    Lower-cases the job title and drops punctuation and bracketed notes,
+    e.g. 'Backend Engineer (m/f/d) - Remote' -> 'backend engineer remote'.
+    """
+    return ' '.join(re.findall(r'\w+', re.sub(r'\([^)]*\)|\[[^\]]*\]', ' ', str(title).lower())))
+
+def shingles(text, size=SHINGLE_SIZE):
+    """
+    Returns the set of `size`-word sequences of the text, ignoring case and punctuation.
+    """
+    words = re.findall(r'\w+', str(text).lower())
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+class MinHasher:
+    """
+    Computes MinHash signatures: the share of equal values in two signatures estimates the
+    Jaccard similarity (shared shingles / all shingles) of two texts.
+    """
+
+    def __init__(self, num_permutations=NUM_PERMUTATIONS, seed=1):
+        import numpy as np # Imported here, so runs that never deduplicate start faster.
+        self._np = np
+        generator = np.random.default_rng(seed)
+        self._a = generator.integers(1, _PRIME, num_permutations, dtype=np.uint64)
+        self._b = generator.integers(0, _PRIME, num_permutations, dtype=np.uint64)
+
+    def shingle_hashes(self, text):
+        """
+        Returns the sorted, unique 32-bit hashes of the text's shingles as a numpy array.
+        """
+        return self._np.unique(self._np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles(text)), dtype=self._np.uint64))
+
+    def signature(self, hashes):
+        return ((self._np.outer(hashes, self._a) + self._b) % _PRIME).min(axis=0)
+
+    def jaccard(self, first_hashes, second_hashes):
+        """
+        Exact Jaccard similarity of two shingle_hashes() arrays.
+        """
+        shared = len(self._np.intersect1d(first_hashes, second_hashes, assume_unique=True))
+        return shared / (len(first_hashes) + len(second_hashes) - shared)
+
+class DuplicateFinder:
+    """
+    Clusters near-duplicate texts with MinHash signatures and an LSH (locality-sensitive hashing)
+    index: only texts that share a band of their signature are compared, so clustering takes
+    roughly linear time. Candidates are confirmed with their exact similarity.
+    Fingerprints are kept between calls (e.g. in watch mode).
+    """
+
+    def __init__(self, threshold=0.8, num_permutations=NUM_PERMUTATIONS, bands=BANDS):
+        if num_permutations % bands:
+            raise ValueError("num_permutations must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows_per_band = num_permutations // bands
+        self.num_permutations = num_permutations
+        self._hasher = None
+        self._fingerprints = {}
+
+    def fingerprint(self, text):
+        """
+        Returns (shingle hashes, signature) for the text, or None if it has no words.
+        """
+        if text not in self._fingerprints:
+            if self._hasher is None:
+                self._hasher = MinHasher(self.num_permutations)
+            hashes = self._hasher.shingle_hashes(text)
+            self._fingerprints[text] = (hashes, self._hasher.signature(hashes)) if len(hashes) else None
+        return self._fingerprints[text]
+
+    def clusters(self, texts, groups=None):
+        """
+        `texts` maps keys (e.g. row indices) to texts, in order. Returns {key: representative key}
+        for every key whose text nearly repeats an earlier one; the representative is the first
+        key of its cluster. Keys without a near-duplicate are left out.
+        With `groups` ({key: value}, e.g. the company), only keys of the same group are compared.
+        """
+        order = {}
+        parent = {}
+
+        def find(key):
+            while parent[key] != key:
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+
+        buckets = defaultdict(list)
+        hashes_of = {}
+        for key, text in texts.items():
+            fingerprint = self.fingerprint(text)
+            if fingerprint is None:
+                continue
+            hashes_of[key], signature = fingerprint
+            order[key] = len(order)
+            parent[key] = key
+            band_buckets = [
+                buckets[(groups.get(key) if groups else None, band, signature[band * self.rows_per_band:(band + 1) * self.rows_per_band].tobytes())]
+                for band in range(self.bands)
+            ]
+            candidates = {other for bucket in band_buckets for other in bucket}
+            for other in sorted(candidates, key=order.get):
+                root, other_root = find(key), find(other)
+                if root != other_root and self._hasher.jaccard(hashes_of[key], hashes_of[other]) >= self.threshold:
+                    # The earlier key stays the representative.
+                    first, second = sorted((root, other_root), key=order.get)
+                    parent[second] = first
+            # One member per cluster is enough in a bucket, so a posting repeated many
+            # times is not compared with every earlier copy.
+            if find(key) == key or not any(find(other) == find(key) for other in candidates):
+                for bucket in band_buckets:
+                    bucket.append(key)
+
+        representatives = {key: find(key) for key in parent}
+        return {key: representative for key, representative in representatives.items() if representative != key}
+
+def group_by_representative(duplicate_of):
+    """
+    Turns {key: representative} into {representative: [representative, duplicate, ...]}, in key order.
+    """
+    groups = defaultdict(list)
+    for key, representative in sorted(duplicate_of.items()):
+        groups[representative].append(key)
+    return {representative: [representative] + keys for representative, keys in groups.items()}
@@ -1,20 +1,49 @@
 import os
 import base64
+import time
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
 from email import encoders
+from email.header import Header
+from email.utils import encode_rfc2231, formataddr, getaddresses, quote
+import uuid
+from collections import Counter
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+from modules import metrics_handler
+from modules.rate_limit_handler import RateLimiter, RateLimitExhausted
+
+# The Google client libraries take a long time to import, so they are imported inside the
+# functions that talk to Gmail. Runs that send no email never load them.
 
 SCOPES = ['https://www.googleapis.com/auth/gmail.send']
 
-def get_gmail_service():
-    # (This function remains the same, no changes needed)
+# Set when the service talks to a local mock instead of Gmail (see get_gmail_service).
+_batch_uri = None
+
+@metrics_handler.timed('gmail.build_service')
+def get_gmail_service(api_endpoint=None):
+    """
+    Builds the Gmail service. Call it once per run and reuse the result.
+    With `api_endpoint` (e.g. a local mock server), no OAuth credentials are needed.
+    """
+    from googleapiclient.discovery import build
+    from googleapiclient.errors import HttpError
+    global _batch_uri
+    if api_endpoint:
+        from google.auth.credentials import AnonymousCredentials
+        try:
+            service = build('gmail', 'v1', credentials=AnonymousCredentials(), client_options={'api_endpoint': api_endpoint})
+            _batch_uri = api_endpoint.rstrip('/') + '/batch/gmail/v1'
+            print(f"Gmail service created for endpoint '{api_endpoint}'.")
+            return service
+        except HttpError as error:
+            print(f'An error occurred while creating Gmail service: {error}')
+            return None
+
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
     creds = None
     if os.path.exists('token.json'):
         creds = Credentials.from_authorized_user_file('token.json', SCOPES)
@@ -30,6 +59,7 @@ def get_gmail_service():
             token.write(creds.to_json())
     try:
         service = build('gmail', 'v1', credentials=creds)
+        _batch_uri = None
         print("Gmail service created successfully.")
         return service
     except HttpError as error:
@@ -65,12 +95,213 @@ def create_message_with_attachment(sender, to, subject, message_text, file_path)
 
     return {'raw': base64.urlsafe_b64encode(message.as_bytes()).decode()}
 
-def send_message(service, user_id, message):
-    # (This function remains the same, no changes needed)
+def _encode_addresses(addresses):
+    """
+    Encodes an address header value, e.g. 'José <jose@example.com>', with only ASCII characters:
+    display names become encoded words and domains are IDNA-encoded.
+    """
+    encoded = []
+    for name, address in getaddresses([' '.join(str(addresses).split())]):
+        local_part, at, domain = address.rpartition('@')
+        if at and not domain.isascii():
+            address = f"{local_part}@{domain.encode('idna').decode('ascii')}"
+        if not address.isascii():
+            raise ValueError(f"Cannot send to '{address}': addresses with non-ASCII characters before the '@' are not supported.")
+        encoded.append(formataddr((name, address), charset='utf-8'))
+    return ', '.join(encoded)
+
+def _attachment_disposition(filename):
+    """
+    Returns the Content-Disposition value for the attachment, with an RFC 2231 filename if it is not ASCII.
+    """
+    if filename.isascii():
+        return f'attachment; filename="{quote(filename)}"'
+    return f"attachment; filename*={encode_rfc2231(filename, 'utf-8')}"
+
+class MessageBuilder:
+    """
+    Builds Gmail-ready messages that all carry the same attachment, e.g. the PDF CV.
+    The attachment is read and encoded once. Each message only encodes its own headers and
+    HTML body, and reuses the already urlsafe-base64-encoded attachment section as is.
+    """
+
+    def __init__(self, sender, attachment_path):
+        try:
+            with open(attachment_path, 'rb') as attachment:
+                data = attachment.read()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Error: Attachment file not found at {attachment_path}")
+
+        self.sender = _encode_addresses(sender)
+        self.boundary = f"==============={uuid.uuid4().hex}=="
+        encoded_attachment = base64.encodebytes(data).replace(b'\n', b'\r\n')
+        tail = (
+            f"--{self.boundary}\r\n"
+            "Content-Type: application/octet-stream\r\n"
+            "MIME-Version: 1.0\r\n"
+            "Content-Transfer-Encoding: base64\r\n"
+            f"Content-Disposition: {_attachment_disposition(os.path.basename(attachment_path))}\r\n"
+            "\r\n"
+        ).encode('ascii') + encoded_attachment + f"\r\n--{self.boundary}--\r\n".encode('ascii')
+        self._encoded_tail = base64.urlsafe_b64encode(tail)
+
+    @metrics_handler.timed('mime.build')
+    def build(self, to, subject, message_text):
+        """
+        Returns the message in the {'raw': ...} form expected by the Gmail API, with an HTML body.
+        Raises ValueError if `to` cannot be written as an email header.
+        """
+        subject = ' '.join(str(subject).split()) # Newlines would break the header block.
+        if not subject.isascii():
+            subject = Header(subject, 'utf-8').encode(linesep='\r\n')
+        head = (
+            f'Content-Type: multipart/mixed; boundary="{self.boundary}"\r\n'
+            "MIME-Version: 1.0\r\n"
+            f"to: {_encode_addresses(to)}\r\n"
+            f"from: {self.sender}\r\n"
+            f"subject: {subject}\r\n"
+            "\r\n"
+            f"--{self.boundary}\r\n"
+            'Content-Type: text/html; charset="utf-8"\r\n'
+            "MIME-Version: 1.0\r\n"
+            "Content-Transfer-Encoding: base64\r\n"
+            "\r\n"
+        ).encode('ascii') + base64.encodebytes(message_text.encode('utf-8')).replace(b'\n', b'\r\n')
+
+        # base64(head + tail) equals base64(head) + base64(tail) only when head is a multiple of
+        # 3 bytes long. Blank lines after a base64 body are ignored by decoders, so they make a safe filler.
+        head += b'\r\n' * (-len(head) % 3 * 2 % 3)
+        return {'raw': (base64.urlsafe_b64encode(head) + self._encoded_tail).decode('ascii')}
+
+def send_message(service, user_id, message, rate_limiter=None):
+    """
+    Sends one message, with the same pacing and retries as send_messages.
+    Returns True if it was sent, False if sending failed, or None if rate limits or connection problems stopped it.
+    """
+    return send_messages(service, user_id, {'message': message}, batch_size=1, rate_limiter=rate_limiter)['message']
+
+def _is_rate_limited(error):
+    """
+    Gmail signals rate limits with 429, or with 403 and a rate-limit reason.
+    """
+    status = error.resp.status
+    return status == 429 or (status == 403 and 'ratelimitexceeded' in str(error).lower().replace(' ', ''))
+
+def _is_retryable(error):
+    """
+    Rate limits and server errors are worth retrying.
+    """
+    return _is_rate_limited(error) or error.resp.status >= 500
+
+def _retry_after(error):
     try:
-        sent_message = service.users().messages().send(userId=user_id, body=message).execute()
-        print(f"Message Id: {sent_message['id']} sent successfully.")
+        return float(error.resp.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+def send_messages(service, user_id, messages, batch_size=10, max_sends_per_second=2.0, max_retries=3, on_result=None, rate_limiter=None):
+    """
+    Sends many messages using Gmail batch requests, paced by `rate_limiter` (a RateLimiter
+    allowing `max_sends_per_second` is created if none is given).
+    `messages` maps a request ID to a message. Rate-limited messages slow the limiter down and are
+    queued again without using up a retry; messages hit by server errors or connection problems are
+    retried up to `max_retries` times with backoff.
+    If the rate limiter gives up, nothing can be sent for the limiter's max_wait, or the connection
+    keeps failing, the messages still queued are given up without counting as failed, so the caller
+    can keep them for a later run.
+    `on_result(request_id, success)` is called as soon as each message's outcome is final.
+    Returns a dict mapping each request ID to True (sent), False (failed) or None (not sent because
+    of rate limits or connection problems).
+    """
+    from googleapiclient.errors import HttpError
+    from googleapiclient.http import BatchHttpRequest
+    from httplib2 import HttpLib2Error
+    if rate_limiter is None:
+        rate_limiter = RateLimiter('gmail', max_sends_per_second * 60)
+    results = {}
+    queue = list(messages)
+    failures = Counter() # Server-error retries per message; rate limits do not count.
+    last_sent = time.monotonic()
+
+    def finish(request_id, success):
+        results[request_id] = success
+        if on_result:
+            on_result(request_id, success)
+
+    def requeue(request_id, error, retry_queue):
+        if _is_rate_limited(error):
+            rate_limiter.on_throttled(_retry_after(error))
+        elif _is_retryable(error) and failures[request_id] < max_retries:
+            failures[request_id] += 1
+        else:
+            return False
+        retry_queue.append(request_id)
         return True
-    except HttpError as error:
-        print(f'An error occurred during sending: {error}')
-        return False
+
+    while queue:
+        retry_queue = []
+        start = 0
+        while start < len(queue):
+            # Batches shrink while the rate is lowered, so one batch does not exceed the quota on its own.
+            current_rate = rate_limiter.rate()
+            chunk = queue[start:start + (min(batch_size, max(1, int(current_rate / 60))) if current_rate else batch_size)]
+            # Stay under the sending rate, so Gmail's per-user quota is not exceeded.
+            try:
+                rate_limiter.acquire(requests=len(chunk))
+            except RateLimitExhausted as e:
+                print(f"Stopped sending: {e}.")
+                for request_id in queue[start:] + retry_queue:
+                    finish(request_id, None)
+                return results
+
+            def callback(request_id, response, exception):
+                if exception is None:
+                    print(f"Message Id: {response['id']} sent successfully.")
+                    metrics_handler.increment('gmail.bytes_sent', len(messages[request_id]['raw']))
+                    rate_limiter.on_success()
+                    nonlocal last_sent
+                    last_sent = time.monotonic()
+                    finish(request_id, True)
+                elif not (isinstance(exception, HttpError) and requeue(request_id, exception, retry_queue)):
+                    print(f'An error occurred during sending: {exception}')
+                    finish(request_id, False)
+
+            batch = BatchHttpRequest(callback=callback, batch_uri=_batch_uri) if _batch_uri else service.new_batch_http_request(callback=callback)
+            for request_id in chunk:
+                batch.add(service.users().messages().send(userId=user_id, body=messages[request_id]), request_id=request_id)
+            try:
+                with metrics_handler.span('gmail.batch'):
+                    batch.execute()
+            except HttpError as error:
+                print(f'An error occurred while sending a batch of {len(chunk)} message(s): {error}')
+                for request_id in chunk:
+                    if request_id not in results and request_id not in retry_queue and not requeue(request_id, error, retry_queue):
+                        finish(request_id, False)
+            except (OSError, HttpLib2Error) as error:
+                # Connection refused, timeouts and the like: retried like server errors, but never
+                # counted as failed, since Gmail may not have been reached at all.
+                print(f'Could not reach Gmail to send a batch of {len(chunk)} message(s): {error!r}')
+                for request_id in chunk:
+                    if request_id in results or request_id in retry_queue:
+                        continue
+                    if failures[request_id] < max_retries:
+                        failures[request_id] += 1
+                        retry_queue.append(request_id)
+                    else:
+                        finish(request_id, None)
+            start += len(chunk)
+
+        queue = retry_queue
+        if queue and time.monotonic() - last_sent > rate_limiter.max_wait:
+            print(f"Stopped sending: nothing could be sent for {rate_limiter.max_wait:.0f}s.")
+            for request_id in queue:
+                finish(request_id, None)
+            break
+        if queue:
+            metrics_handler.increment('gmail.retries', len(queue))
+            # Rate-limited messages wait in rate_limiter.acquire(); server errors back off here.
+            attempt = max(failures[request_id] for request_id in queue)
+            delay = 2 ** attempt if attempt else 0
+            print(f"{len(queue)} message(s) could not be sent yet and are queued again" + (f" in {delay}s." if delay else "."))
+            time.sleep(delay)
+    return results
@@ -1,5 +1,12 @@
-import pandas as pd
 import os
+import json
+import posixpath
+import re
+import zipfile
+from collections import Counter
+from xml.etree import ElementTree
+
+from modules import metrics_handler
 
 def check_file_writable(file_path):
     """
@@ -14,24 +21,85 @@ def check_file_writable(file_path):
     except IOError:
         return False
 
-def read_excel_file(file_path):
+# --- Parsed snapshot ---
+# Parsing a large workbook with openpyxl is slow, so the parsed table is also kept as a Parquet
+# sidecar file. It is used only while the workbook's modification time and size are unchanged.
+_last_read = None # ((workbook path, signature), DataFrame) of the last full read in this process
+
+def _snapshot_paths(file_path):
+    directory, name = os.path.split(file_path)
+    base = os.path.join(directory, f".{name}.snapshot")
+    return base + '.parquet', base + '.json'
+
+def workbook_signature(file_path):
+    stat = os.stat(file_path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+def _read_snapshot(file_path, columns=None):
+    """
+    Returns the snapshot if it matches the current workbook, otherwise None.
+    """
+    data_path, meta_path = _snapshot_paths(file_path)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as file:
+            if json.load(file) != workbook_signature(file_path):
+                return None
+        import pandas as pd
+        return pd.read_parquet(data_path, columns=columns)
+    except Exception:
+        # Missing, stale or unreadable snapshot (or no Parquet engine installed): parse the workbook instead.
+        return None
+
+def _write_snapshot(df, file_path):
+    data_path, meta_path = _snapshot_paths(file_path)
+    try:
+        df.to_parquet(data_path, index=False)
+        with open(meta_path, 'w', encoding='utf-8') as file:
+            json.dump(workbook_signature(file_path), file)
+    except Exception:
+        # The snapshot is only an optimization (it needs pyarrow); the workbook stays the source of truth.
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+@metrics_handler.timed('excel.read')
+def read_excel_file(file_path, columns=None):
     """
     Reads the Excel file into a pandas DataFrame, ensuring all columns are text.
+    Pass `columns` to load only the columns a step needs (e.g. ['Status']).
     """
+    global _last_read
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Error: Excel tracker file not found at '{file_path}'")
-    
+
+    # Two workbooks can share a modification time and size, so the path is part of the key.
+    read_key = (os.path.abspath(file_path), workbook_signature(file_path))
+    if _last_read is not None and _last_read[0] == read_key:
+        df = _last_read[1]
+        return df[columns].copy() if columns else df.copy()
+
+    df = _read_snapshot(file_path, columns)
+    if df is not None:
+        if not columns:
+            _last_read = (read_key, df.copy())
+        print(f"Excel file '{file_path}' loaded from its snapshot. Found {len(df)} rows.")
+        return df
+
+    import pandas as pd # Imported here, so runs that never load the full tracker start faster.
     try:
         df = pd.read_excel(file_path, dtype=str)
         df = df.fillna('')
         print(f"Excel file '{file_path}' loaded successfully. Found {len(df)} rows.")
-        return df
     except Exception as e:
         raise IOError(f"An error occurred while reading the Excel file: {e}")
 
+    _write_snapshot(df, file_path)
+    _last_read = (read_key, df.copy())
+    return df[columns].copy() if columns else df
+
+@metrics_handler.timed('excel.write')
 def write_excel_file(df, file_path):
     """
-    Saves the updated DataFrame back to the Excel file.
+    Saves the updated DataFrame back to the Excel file, and refreshes its snapshot.
     """
     try:
         df.to_excel(file_path, index=False)
@@ -40,4 +108,63 @@ def write_excel_file(df, file_path):
         raise PermissionError("FATAL ERROR: Could not save the file. Please close 'SeekingJobs.xlsx' and run the script again.")
     except Exception as e:
         raise IOError(f"An unexpected error occurred while saving the file: {e}")
+    _write_snapshot(df, file_path)
+
+# --- Quick status count ---
+# Reads the workbook's XML directly (an .xlsx file is a zip archive), so status counts
+# are available without importing pandas or openpyxl.
+_SHEET_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_RELATIONSHIP_ID = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+
+def _first_sheet_path(archive):
+    workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+    relationship_id = workbook.find(f'{_SHEET_NS}sheets/{_SHEET_NS}sheet').get(_RELATIONSHIP_ID)
+    relationships = ElementTree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    target = next(rel.get('Target') for rel in relationships if rel.get('Id') == relationship_id)
+    return target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+
+def _shared_strings(archive):
+    if 'xl/sharedStrings.xml' not in archive.namelist():
+        return []
+    strings = []
+    for _, element in ElementTree.iterparse(archive.open('xl/sharedStrings.xml')):
+        if element.tag == f'{_SHEET_NS}si':
+            strings.append(''.join(text.text or '' for text in element.iter(f'{_SHEET_NS}t')))
+            element.clear()
+    return strings
+
+def _cell_value(cell, shared_strings):
+    cell_type = cell.get('t')
+    if cell_type == 'inlineStr':
+        return ''.join(text.text or '' for text in cell.iter(f'{_SHEET_NS}t'))
+    value = cell.findtext(f'{_SHEET_NS}v') or ''
+    return shared_strings[int(value)] if cell_type == 's' and value else value
 
+def count_statuses(file_path, column='Status'):
+    """
+    Returns a Counter of the normalized (stripped, lower-case) values of the status column.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Error: Excel tracker file not found at '{file_path}'")
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            shared_strings = _shared_strings(archive)
+            counts = Counter()
+            status_letters = None
+            for _, element in ElementTree.iterparse(archive.open(_first_sheet_path(archive))):
+                if element.tag != f'{_SHEET_NS}row':
+                    continue
+                cells = {re.sub(r'\d', '', cell.get('r', '')): cell for cell in element.iter(f'{_SHEET_NS}c')}
+                if status_letters is None:
+                    # The first row holds the column headers.
+                    status_letters = next((letters for letters, cell in cells.items() if _cell_value(cell, shared_strings).strip() == column), '')
+                    if not status_letters:
+                        raise ValueError(f"no '{column}' column in the first row")
+                elif status_letters in cells:
+                    status = _cell_value(cells[status_letters], shared_strings).strip().lower()
+                    if status:
+                        counts[status] += 1
+                element.clear()
+            return counts
+    except (zipfile.BadZipFile, KeyError, StopIteration, ValueError, ElementTree.ParseError) as e:
+        raise IOError(f"An error occurred while reading the Excel file: {e}")
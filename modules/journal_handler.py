@@ -0,0 +1,70 @@
+# This module journals every tracker change as it happens, so an interrupted run can be recovered.
+import json
+import os
+import sqlite3
+import time
+
+class TrackerJournal:
+    """
+    An append-only SQLite log of row changes made during a run.
+    Each change is committed immediately; the Excel file is only rewritten once, at the end.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        try:
+            self._conn = sqlite3.connect(db_path, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=FULL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS changes ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, row_index INTEGER NOT NULL, job_title TEXT NOT NULL, "
+                "company TEXT NOT NULL, changes TEXT NOT NULL, recorded_at REAL NOT NULL)"
+            )
+        except sqlite3.Error as e:
+            raise IOError(f"Could not open the tracker journal at '{db_path}': {e}")
+
+    def record(self, index, row, changes):
+        """
+        Commits the new values of one row. The job title and company identify the row on recovery.
+        """
+        self._conn.execute(
+            "INSERT INTO changes (row_index, job_title, company, changes, recorded_at) VALUES (?, ?, ?, ?, ?)",
+            (int(index), str(row['Job Title']), str(row['Company']), json.dumps(changes, ensure_ascii=False), time.time()),
+        )
+
+    def has_changes(self):
+        return self._conn.execute("SELECT 1 FROM changes LIMIT 1").fetchone() is not None
+
+    def replay(self, df):
+        """
+        Applies the journaled changes to the DataFrame in the order they were made.
+        Changes for rows that no longer match (moved or edited in the meantime) are skipped.
+        Returns the number of (applied, skipped) changes.
+        """
+        applied, skipped = 0, 0
+        for row_index, job_title, company, changes in self._conn.execute(
+            "SELECT row_index, job_title, company, changes FROM changes ORDER BY id"
+        ):
+            if row_index not in df.index or df.at[row_index, 'Job Title'] != job_title or df.at[row_index, 'Company'] != company:
+                skipped += 1
+                continue
+            for column, value in json.loads(changes).items():
+                df.at[row_index, column] = value
+            applied += 1
+        return applied, skipped
+
+    def clear(self):
+        """
+        Empties the journal once its changes are safely saved to the Excel file.
+        """
+        self._conn.execute("DELETE FROM changes")
+
+    def close(self):
+        self._conn.close()
+
+def default_journal_path(excel_path):
+    """
+    Keeps the journal next to the tracker file, e.g. 'data/SeekingJobs.journal.sqlite3'.
+    """
+    return os.path.splitext(excel_path)[0] + '.journal.sqlite3'
@@ -0,0 +1,117 @@
+# This module measures where a run spends its time and tokens, and writes a report at the end.
+import functools
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+_durations = defaultdict(list)
+_counters = Counter()
+_lock = threading.Lock()
+_started_at = time.time()
+
+def record(stage, seconds):
+    """
+    Adds one measured duration to a stage, e.g. record('openai.first_token', 0.4).
+    """
+    with _lock:
+        _durations[stage].append(seconds)
+
+def increment(counter, value=1):
+    """
+    Adds to a run counter, e.g. increment('gmail.bytes_sent', 2048).
+    """
+    if value:
+        with _lock:
+            _counters[counter] += value
+
+def get_counter(counter):
+    with _lock:
+        return _counters[counter]
+
+@contextmanager
+def span(stage):
+    """
+    Times the enclosed block as one call of `stage`. The time is recorded even if the block raises.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - started)
+
+def timed(stage):
+    """
+    Decorator form of span(): every call of the function is timed as one call of `stage`.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def percentile(values, fraction):
+    """
+    Linear-interpolated percentile of a non-empty list, e.g. percentile(values, 0.95).
+    """
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def build_report(extra=None):
+    """
+    Returns this run's stages (count, total, p50, p95, max in seconds) and counters as a JSON-ready dict.
+    """
+    with _lock:
+        durations = {stage: list(values) for stage, values in _durations.items()}
+        counters = dict(_counters)
+    report = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(_started_at)),
+        "duration_seconds": round(time.time() - _started_at, 3),
+        "stages": {
+            stage: {
+                "count": len(values),
+                "total": round(sum(values), 6),
+                "p50": round(percentile(values, 0.5), 6),
+                "p95": round(percentile(values, 0.95), 6),
+                "max": round(max(values), 6),
+            }
+            for stage, values in sorted(durations.items())
+        },
+        "counters": dict(sorted(counters.items())),
+    }
+    report.update(extra or {})
+    return report
+
+def format_report(report):
+    """
+    Returns the report as lines of text for the console.
+    """
+    lines = [f"Run took {report['duration_seconds']:.1f}s."]
+    for stage, stats in report['stages'].items():
+        lines.append(f"{stage}: {stats['count']} call(s), p50 {stats['p50'] * 1000:.1f}ms, p95 {stats['p95'] * 1000:.1f}ms, total {stats['total']:.2f}s")
+    if report['counters']:
+        lines.append(", ".join(f"{counter}={value}" for counter, value in report['counters'].items()))
+    return lines
+
+def append_report(report, file_path):
+    """
+    Appends the report as one JSON line, so runs can be compared over time.
+    """
+    try:
+        with open(file_path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(report, ensure_ascii=False) + "\n")
+    except OSError as e:
+        raise IOError(f"Error writing the run report to '{file_path}': {e}")
+
+def default_report_path(excel_path):
+    """
+    Keeps the run reports next to the tracker file.
+    """
+    return os.path.join(os.path.dirname(excel_path), 'run_reports.jsonl')
@@ -0,0 +1,194 @@
+# This module paces the requests sent to OpenAI and Gmail, so a large run stays just under each
+# provider's rate limits instead of running into them, and slows down when it does hit them.
+import re
+import threading
+import time
+
+from modules import metrics_handler
+
+# AIMD (additive increase, multiplicative decrease): every success raises the rate by a small
+# share of its ceiling, every throttled request halves it, but never below MIN_RATE_FRACTION.
+INCREASE_FRACTION = 0.05
+DECREASE_FACTOR = 0.5
+MIN_RATE_FRACTION = 0.05
+# Pause after a throttled request when the provider does not say how long to wait.
+DEFAULT_COOLDOWN_SECONDS = 1.0
+# Longest single sleep while waiting, so a rate raised in the meantime is noticed.
+MAX_SLEEP_SECONDS = 1.0
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+class RateLimitExhausted(RuntimeError):
+    """
+    Raised when no capacity becomes available within the limiter's `max_wait`, or the quota is used up.
+    """
+
+def parse_duration(value):
+    """
+    Parses a rate-limit reset time such as '20ms', '1.5s' or '6m0s' into seconds, or returns None.
+    """
+    parts = _DURATION_PART.findall(str(value or ''))
+    if not parts:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+class TokenBucket:
+    """
+    Refills `rate` tokens per second up to `capacity` (one second's worth). A take() larger than what
+    is left puts the bucket in debt, so a request bigger than the capacity still gets through and the
+    following requests wait until the debt is repaid. Not thread-safe; RateLimiter holds the lock.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    @property
+    def capacity(self):
+        return max(1.0, self.rate)
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount):
+        """
+        Seconds until `amount` tokens (at most a full bucket) are available.
+        """
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount):
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+class RateLimiter:
+    """
+    Paces one provider's calls with a requests-per-minute and an optional tokens-per-minute bucket.
+    A rate of 0 means no limit until the provider reports one in its x-ratelimit-* response headers.
+    The rates adapt while the run goes: they grow after each success and halve when the provider
+    throttles, and the headers correct both the ceiling and the budget left in the current window.
+    Thread-safe: all workers of a run share one limiter per provider.
+    """
+
+    def __init__(self, name, requests_per_minute, tokens_per_minute=0, max_wait=600):
+        self.name = name
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._ceilings = {}
+        self._buckets = {}
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._exhausted = None
+        for kind, per_minute in (('requests', requests_per_minute), ('tokens', tokens_per_minute)):
+            if per_minute:
+                self._set_ceiling(kind, per_minute / 60)
+
+    def _set_ceiling(self, kind, per_second):
+        self._ceilings[kind] = per_second
+        bucket = self._buckets.get(kind)
+        if bucket is None:
+            self._buckets[kind] = TokenBucket(per_second)
+        else:
+            bucket.rate = min(bucket.rate, per_second)
+
+    def rate(self, kind='requests'):
+        """
+        The current rate per minute, or None if there is no limit for `kind`.
+        """
+        with self._lock:
+            bucket = self._buckets.get(kind)
+            return bucket.rate * 60 if bucket else None
+
+    def acquire(self, requests=1, tokens=0):
+        """
+        Blocks until `requests` requests using about `tokens` tokens may be sent, then takes them.
+        Raises RateLimitExhausted if that would take longer than `max_wait` seconds.
+        """
+        amounts = {'requests': requests, 'tokens': tokens}
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                if self._exhausted:
+                    raise RateLimitExhausted(self._exhausted)
+                now = time.monotonic()
+                delay = self._paused_until - now
+                for kind, bucket in self._buckets.items():
+                    bucket.refill(now)
+                    delay = max(delay, bucket.wait_time(amounts[kind]))
+                if delay <= 0:
+                    for kind, bucket in self._buckets.items():
+                        bucket.take(amounts[kind])
+                    break
+            if now + delay - started > self.max_wait:
+                raise RateLimitExhausted(f"{self.name} rate limit: no capacity within {self.max_wait:.0f}s")
+            time.sleep(min(delay, MAX_SLEEP_SECONDS))
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            metrics_handler.record(f'{self.name}.rate_limit_wait', waited)
+
+    def settle_tokens(self, reserved, used):
+        """
+        Corrects the token bucket once a request's real token usage is known.
+        """
+        with self._lock:
+            bucket = self._buckets.get('tokens')
+            if bucket is not None:
+                bucket.refill(time.monotonic())
+                bucket.take(used - reserved)
+
+    def on_success(self):
+        with self._lock:
+            for kind, bucket in self._buckets.items():
+                bucket.rate = min(self._ceilings[kind], bucket.rate + self._ceilings[kind] * INCREASE_FRACTION)
+
+    def on_throttled(self, retry_after=None):
+        """
+        Called when the provider rejected a request for its rate limit: every worker pauses for
+        `retry_after` seconds, and the rates are halved (once per pause, however many requests failed).
+        """
+        metrics_handler.increment(f'{self.name}.throttled')
+        with self._lock:
+            now = time.monotonic()
+            cooldown = retry_after if retry_after is not None else DEFAULT_COOLDOWN_SECONDS
+            self._paused_until = max(self._paused_until, now + cooldown)
+            if now - self._last_decrease < cooldown:
+                return
+            self._last_decrease = now
+            for kind, bucket in self._buckets.items():
+                bucket.rate = max(self._ceilings[kind] * MIN_RATE_FRACTION, bucket.rate * DECREASE_FACTOR)
+                bucket.tokens = min(bucket.tokens, 0.0)
+
+    def exhaust(self, reason):
+        """
+        Makes every later acquire() fail right away, e.g. when the account's quota is used up.
+        """
+        with self._lock:
+            self._exhausted = reason
+
+    def update_from_headers(self, headers):
+        """
+        Applies x-ratelimit-limit-*, x-ratelimit-remaining-* and x-ratelimit-reset-* headers
+        (for requests and tokens, per minute, as sent by OpenAI).
+        """
+        if not headers:
+            return
+        with self._lock:
+            now = time.monotonic()
+            for kind in ('requests', 'tokens'):
+                try:
+                    limit = float(headers.get(f'x-ratelimit-limit-{kind}') or 0)
+                    remaining = float(headers.get(f'x-ratelimit-remaining-{kind}', ''))
+                except ValueError:
+                    continue
+                if limit and limit / 60 != self._ceilings.get(kind):
+                    self._set_ceiling(kind, limit / 60)
+                bucket = self._buckets.get(kind)
+                if bucket is None:
+                    continue
+                bucket.refill(now)
+                bucket.tokens = min(bucket.tokens, remaining)
+                reset = parse_duration(headers.get(f'x-ratelimit-reset-{kind}'))
+                if remaining < 1 and reset:
+                    self._paused_until = max(self._paused_until, now + reset)
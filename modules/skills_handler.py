@@ -0,0 +1,184 @@
+# This module extracts skills locally from a skills taxonomy, so common job descriptions need no AI request.
+import re
+from collections import Counter, deque
+
+import yaml
+
+SKILL_KINDS = ('technical_skills', 'soft_skills')
+
+def normalize_text(text):
+    return re.sub(r"\s+", " ", str(text).lower())
+
+def normalize_spaces(text):
+    """
+    Collapses runs of spaces and tabs, keeping line breaks (and the capitalization).
+    """
+    return re.sub(r"[^\S\n]+", " ", str(text))
+
+def _starts_sentence(text, start, end):
+    """
+    True if the match begins a sentence, line or bullet and is followed by a lower-case word other than
+    'and'/'or', e.g. 'React quickly to...', where a capitalized ordinary word is not a skill name.
+    """
+    before = text[:start].rstrip(' -*•')
+    return (not before or before[-1] in '.!?:;\n') and re.match(r" (?!(?:and|or)\b)[a-z]", text[end:end + 5]) is not None
+
+def _is_word_char(char):
+    return char.isalnum() or char == '_'
+
+class AhoCorasick:
+    """
+    Finds every occurrence of many phrases in one pass over the text.
+    """
+
+    def __init__(self, phrases):
+        # phrases: {phrase: value}
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for phrase, value in phrases.items():
+            state = 0
+            for char in phrase:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append((len(phrase), value))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find(self, text):
+        """
+        Yields (start, end, value) for every phrase match that starts and ends on a word boundary.
+        """
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, value in self._output[state]:
+                start, end = position - length + 1, position + 1
+                if (start == 0 or not _is_word_char(text[start - 1])) and (end == len(text) or not _is_word_char(text[end])):
+                    yield start, end, value
+
+class SkillTaxonomy:
+    """
+    A dictionary of canonical skills and their aliases, compiled into an Aho-Corasick index.
+    `extract` returns the same shape as the AI skill extraction, or None when the description
+    is not covered well enough to trust the local result.
+    Names and aliases listed as ambiguous (ordinary words such as 'React' or 'Swift') only match
+    with their exact capitalization, and do not count towards the coverage.
+    """
+
+    def __init__(self, entries=None, confidence_threshold=0.6):
+        # entries: {kind: {canonical name: [aliases]}, 'ambiguous': [names and aliases]}
+        self.confidence_threshold = confidence_threshold
+        self._kind_of = {}
+        self._canonical_of = {}
+        self._exact_canonical_of = {}
+        self._exact_lowered = set()
+        self._ambiguous = {normalize_spaces(alias).strip() for alias in (entries or {}).get('ambiguous') or []}
+        self._matcher = None
+        self._exact_matcher = None
+        for kind in SKILL_KINDS:
+            for name, aliases in ((entries or {}).get(kind) or {}).items():
+                self.add(kind, name, aliases or [])
+
+    @classmethod
+    def load(cls, file_path, confidence_threshold=0.6):
+        try:
+            with open(file_path, 'r', encoding='utf-8') as file:
+                return cls(yaml.safe_load(file), confidence_threshold)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Error: Skills taxonomy file not found at '{file_path}'")
+        except Exception as e:
+            raise IOError(f"Error reading the skills taxonomy file: {e}")
+
+    def add(self, kind, name, aliases=()):
+        """
+        Adds a skill and its aliases. Aliases already mapped to another skill keep their first meaning.
+        """
+        for alias in [name, *aliases]:
+            if normalize_spaces(alias).strip() in self._ambiguous:
+                alias, index = normalize_spaces(alias).strip(), self._exact_canonical_of
+            else:
+                alias, index = normalize_text(alias).strip(), self._canonical_of
+            if alias and not self.knows(alias):
+                index[alias] = name
+                if index is self._exact_canonical_of:
+                    self._exact_lowered.add(alias.lower())
+                self._kind_of[name] = kind
+                self._matcher = self._exact_matcher = None
+
+    def knows(self, skill):
+        skill = normalize_text(skill).strip()
+        return skill in self._canonical_of or skill in self._exact_lowered
+
+    def __len__(self):
+        return len(self._kind_of)
+
+    def learn_from_tracker(self, df, min_count=2):
+        """
+        Adds skills that earlier AI extractions wrote to the tracker's 'Technical Skills' and
+        'Soft Skills' columns at least `min_count` times. Returns the number of new skills.
+        """
+        learned = 0
+        for kind, column in (('technical_skills', 'Technical Skills'), ('soft_skills', 'Soft Skills')):
+            if column not in df.columns:
+                continue
+            counts = Counter()
+            for cell in df[column].dropna().astype(str):
+                counts.update({skill.strip() for skill in cell.split(',') if skill.strip()})
+            for skill, count in counts.items():
+                if count >= min_count and not self.knows(skill):
+                    self.add(kind, skill)
+                    learned += 1
+        return learned
+
+    def _requirement_lines(self, text):
+        """
+        Splits a description into bullet lines or sentences that are long enough to state a requirement.
+        """
+        parts = re.split(r"\n+|(?<=[.!?;])\s+", str(text))
+        return [part for part in parts if len(part.split()) >= 3]
+
+    def extract(self, job_description):
+        """
+        Returns {'technical_skills': [...], 'soft_skills': [...]} in order of first mention, or None if
+        fewer than `confidence_threshold` of the description's requirement lines mention a known skill,
+        or if no technical or no soft skill was found.
+        """
+        if self._matcher is None:
+            self._matcher = AhoCorasick(self._canonical_of)
+            self._exact_matcher = AhoCorasick(self._exact_canonical_of)
+
+        text = normalize_spaces(job_description)
+        matches = list(self._matcher.find(normalize_text(job_description)))
+        matches += [match for match in self._exact_matcher.find(text) if not _starts_sentence(text, match[0], match[1])]
+        found = {kind: [] for kind in SKILL_KINDS}
+        for _, _, name in sorted(matches, key=lambda match: match[0]):
+            skills = found[self._kind_of[name]]
+            if name not in skills:
+                skills.append(name)
+        if not all(found.values()):
+            return None
+
+        # Only unambiguous matches make a line count as covered.
+        lines = self._requirement_lines(job_description)
+        covered = sum(1 for line in lines if next(self._matcher.find(normalize_text(line)), None))
+        if not lines or covered / len(lines) < self.confidence_threshold:
+            return None
+        return found
@@ -0,0 +1,61 @@
+# This module keeps track of which tracker rows have which status, and batches row updates.
+
+def normalize_status(status):
+    return str(status).strip().lower()
+
+class StatusIndex:
+    """
+    Maps each normalized status (e.g. 'pending') to the rows that currently have it.
+    Built once when the tracker is loaded and kept up to date as statuses change.
+    """
+
+    def __init__(self, statuses):
+        normalized = statuses.astype(str).str.strip().str.lower()
+        self._status_of = dict(zip(normalized.index, normalized))
+        self._rows = {status: set(rows) for status, rows in normalized.groupby(normalized, sort=False).groups.items()}
+
+    def count(self, status):
+        return len(self._rows.get(normalize_status(status), ()))
+
+    def status_of(self, index):
+        return self._status_of.get(index)
+
+    def rows(self, status):
+        """
+        Returns the rows with this status, in tracker order.
+        """
+        return sorted(self._rows.get(normalize_status(status), ()))
+
+    def set_status(self, index, status):
+        status = normalize_status(status)
+        old_status = self._status_of.get(index)
+        if old_status == status:
+            return
+        if old_status is not None:
+            self._rows[old_status].discard(index)
+        self._rows.setdefault(status, set()).add(index)
+        self._status_of[index] = status
+
+class RowUpdateBuffer:
+    """
+    Collects cell updates and writes them to the DataFrame with one assignment per column.
+    Status changes are passed on to the StatusIndex right away.
+    """
+
+    def __init__(self, status_index=None):
+        self.status_index = status_index
+        self._columns = {}
+
+    def set(self, index, changes):
+        for column, value in changes.items():
+            self._columns.setdefault(column, {})[index] = value
+        if self.status_index is not None and 'Status' in changes:
+            self.status_index.set_status(index, changes['Status'])
+
+    def apply(self, df):
+        for column, values in self._columns.items():
+            df.loc[list(values), column] = list(values.values())
+        self._columns = {}
+
+    def __len__(self):
+        return sum(len(values) for values in self._columns.values())
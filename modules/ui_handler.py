@@ -1,4 +1,7 @@
 # This module handles all user interface interactions, like printing formatted messages.
+import sys
+import threading
+import time
 
 def print_header(title):
     """Prints a main header."""
@@ -28,6 +31,103 @@ def print_error(message):
     """Prints an error message."""
     print(f"  [✘] ERROR: {message}")
 
+class _DisplayOutput:
+    """
+    Stands in for sys.stdout while a ProgressDisplay is open, so every complete line printed
+    (from any thread) is written above the live line instead of through it.
+    """
+
+    def __init__(self, display, stdout):
+        self._display = display
+        self._stdout = stdout
+        self._partial = threading.local() # print() writes the text and the newline separately.
+
+    def write(self, text):
+        pending = getattr(self._partial, 'text', '') + text
+        lines, newline, self._partial.text = pending.rpartition('\n')
+        if newline:
+            self._display.print_above(lines + newline)
+        return len(text)
+
+    def __getattr__(self, name):
+        return getattr(self._stdout, name)
+
+class ProgressDisplay:
+    """
+    A live one-line display of email generation: tokens/sec of the job that is streaming and the ETA of the whole queue.
+    Safe to update from worker threads. Nothing is drawn when the output is not an interactive console.
+    Until close(), everything printed goes through the display and appears above the live line.
+    """
+    REDRAW_INTERVAL = 0.1
+    WIDTH = 78
+
+    def __init__(self, total_jobs):
+        self.total_jobs = total_jobs
+        self.done_jobs = 0
+        self.started_at = time.monotonic()
+        self.enabled = sys.stdout.isatty()
+        self._jobs = {}
+        self._last_draw = 0.0
+        self._lock = threading.RLock()
+        self._stdout = sys.stdout
+        if self.enabled:
+            sys.stdout = _DisplayOutput(self, self._stdout)
+
+    def tracker(self, key, label):
+        """
+        Returns the on_progress(token_count) callback for one job.
+        """
+        def on_progress(token_count):
+            with self._lock:
+                # The rate is measured from the first token, so time spent waiting in the queue is not counted.
+                job = self._jobs.setdefault(key, {'label': label, 'started_at': time.monotonic(), 'first_tokens': token_count})
+                job['tokens'] = token_count
+                self._draw(key)
+        return on_progress
+
+    def finish(self, key):
+        with self._lock:
+            self.done_jobs += 1
+            self._jobs.pop(key, None)
+            self._draw(force=True)
+
+    def _draw(self, key=None, force=False):
+        now = time.monotonic()
+        if not self.enabled or (not force and now - self._last_draw < self.REDRAW_INTERVAL):
+            return
+        self._last_draw = now
+        parts = [f"Emails: {self.done_jobs}/{self.total_jobs}"]
+        job = self._jobs.get(key)
+        if job and now - job['started_at'] >= self.REDRAW_INTERVAL:
+            rate = (job['tokens'] - job['first_tokens']) / (now - job['started_at'])
+            parts.append(f"'{job['label'][:24]}': {rate:.0f} tokens/s")
+        if self.done_jobs:
+            remaining = (now - self.started_at) / self.done_jobs * (self.total_jobs - self.done_jobs)
+            parts.append(f"ETA {int(remaining // 60)}:{int(remaining % 60):02d}")
+        self._stdout.write("\r  " + " | ".join(parts).ljust(self.WIDTH - 2))
+        self._stdout.flush()
+
+    def print_above(self, text):
+        """
+        Writes complete lines of text above the live line, then draws the live line again.
+        """
+        with self._lock:
+            if self._last_draw:
+                self._stdout.write("\r" + " " * self.WIDTH + "\r")
+            self._stdout.write(text)
+            if self._last_draw:
+                self._draw(force=True)
+            else:
+                self._stdout.flush()
+
+    def close(self):
+        with self._lock:
+            if isinstance(sys.stdout, _DisplayOutput) and sys.stdout._display is self:
+                sys.stdout = self._stdout
+            if self.enabled and self._last_draw:
+                self._stdout.write("\n")
+                self._stdout.flush()
+
 def get_user_choice(config_mode):
     """
     Asks the user to choose the automation mode and explains the options.
@@ -44,18 +144,20 @@ def get_user_choice(config_mode):
     print("   - Processes 'Pending' jobs, generates emails, AND sends them immediately.")
     print("   - Status changes directly from 'Pending' to 'Applied' or 'Failed'.")
 
+    print("\n3. BATCH MODE (Large backlogs, lower cost)")
+    print("   - Sends all 'Pending' jobs to the OpenAI Batch API and waits for the results (up to 24 hours).")
+    print("   - Status changes to 'Ready to Send'. If interrupted, choose BATCH again to resume.")
+
+    modes = {'1': 'REVIEW', '2': 'FULL', '3': 'BATCH'}
     while True:
-        default_choice = "1" if config_mode.upper() == 'REVIEW' else "2"
-        choice = input(f"\nEnter your choice (1 for REVIEW, 2 for FULL) [Default: {default_choice}]: ").strip()
+        default_choice = {'FULL': '2', 'BATCH': '3'}.get(config_mode.upper(), '1')
+        choice = input(f"\nEnter your choice (1 for REVIEW, 2 for FULL, 3 for BATCH) [Default: {default_choice}]: ").strip()
         
         if not choice:
             choice = default_choice
 
-        if choice == '1':
-            print_success("REVIEW mode selected.")
-            return 'REVIEW'
-        elif choice == '2':
-            print_success("FULL mode selected.")
-            return 'FULL'
+        if choice in modes:
+            print_success(f"{modes[choice]} mode selected.")
+            return modes[choice]
         else:
-            print_error("Invalid choice. Please enter 1 or 2.")
\ No newline at end of file
+            print_error("Invalid choice. Please enter 1, 2 or 3.")
\ No newline at end of file
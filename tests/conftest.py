@@ -0,0 +1,37 @@
+# Shared fixtures: the local fake OpenAI and Gmail servers from bench/, and workspaces that use them.
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'bench'))
+
+import bench_pipeline
+import fake_servers
+
+TRACKER_PATH = os.path.join('data', 'SeekingJobs.xlsx') # Relative to the workspace.
+
+@pytest.fixture(scope='session')
+def servers():
+    """
+    Returns (openai_port, gmail_port) of fake servers shared by all tests. Their stats add up across tests.
+    """
+    process, openai_port, gmail_port = fake_servers.start_servers({}, {})
+    yield openai_port, gmail_port
+    process.terminate()
+
+@pytest.fixture
+def make_workspace(tmp_path, monkeypatch):
+    """
+    Returns make_workspace(bench_args, openai_port, gmail_port), which writes a bench_pipeline workspace
+    (config.ini, CV, prompts and tracker, see bench/bench_pipeline.py --help for `bench_args`) to
+    tmp_path and changes into it.
+    """
+    def make(bench_args, openai_port, gmail_port):
+        arguments = bench_pipeline.parse_args(['--attachment-kb', '1', *bench_args])
+        bench_pipeline.write_workspace(str(tmp_path), arguments, openai_port, gmail_port)
+        monkeypatch.chdir(tmp_path)
+        return tmp_path
+    return make
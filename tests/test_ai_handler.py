@@ -0,0 +1,70 @@
+# Streamed email generation: answers are checked while they arrive, with a length limit per email.
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import ROOT
+from modules import ai_handler
+
+CONTACTS = ['Ana Núñez', 'Bob Stone', 'Chen Li']
+PROMPTS = ai_handler.load_prompts(os.path.join(ROOT, 'prompts.yaml'))
+JOB_DETAILS = {
+    'cv_content': '# Jane Doe', 'job_title': 'Developer', 'company_name': 'Acme', 'platform': 'LinkedIn',
+    'company_description': '', 'job_description': 'Python', 'technical_skills': 'Python', 'soft_skills': '',
+}
+
+class FakeStream:
+    """
+    Yields the answer in chunks shaped like the OpenAI SDK's streamed chunks.
+    """
+
+    def __init__(self, content, chunk_size=500):
+        self.chunks = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+
+    def __iter__(self):
+        for text in self.chunks:
+            yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def streamed_answers(monkeypatch):
+    """
+    Answers every completion request with the next queued answer and records the requests.
+    """
+    answers, requests = [], []
+    def create_completion(**kwargs):
+        requests.append(kwargs)
+        return FakeStream(answers.pop(0))
+    monkeypatch.setattr(ai_handler, '_create_completion', create_completion)
+    monkeypatch.setattr(ai_handler, '_stream', True)
+    monkeypatch.setattr(ai_handler, '_cache', None)
+    return answers, requests
+
+def email_answer(contacts, body_length):
+    body = '<p>' + 'x' * body_length + '</p>'
+    return json.dumps({'emails': [{'contact_person': person, 'subject': f'Hello {person}', 'body': body} for person in contacts]})
+
+def test_long_multi_contact_answer_is_accepted(streamed_answers):
+    answers, requests = streamed_answers
+    # Each email is well within the limit, but together they are longer than one email's limit.
+    answers.append(email_answer(CONTACTS, ai_handler.MAX_STREAMED_CHARS // 2))
+
+    emails = ai_handler.generate_emails_for_contacts(JOB_DETAILS, CONTACTS, PROMPTS)
+
+    assert len(requests) == 1
+    assert [email['subject'] for email in emails] == [f'Hello {person}' for person in CONTACTS]
+
+def test_runaway_answer_is_cancelled(streamed_answers):
+    answers, requests = streamed_answers
+    answers.append(email_answer(CONTACTS, ai_handler.MAX_STREAMED_CHARS * 2))
+    # The fallback asks for each email on its own.
+    answers.extend(json.dumps({'subject': f'Hi {person}', 'body': '<p>Hi</p>'}) for person in CONTACTS)
+
+    emails = ai_handler.generate_emails_for_contacts(JOB_DETAILS, CONTACTS, PROMPTS)
+
+    assert len(requests) == 1 + len(CONTACTS)
+    assert [email['subject'] for email in emails] == [f'Hi {person}' for person in CONTACTS]
@@ -0,0 +1,111 @@
+# BATCH mode end to end: submit, poll, merge and resume against the local fake OpenAI server.
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import main
+from conftest import TRACKER_PATH
+from modules import batch_handler, journal_handler
+
+STATE_PATH = os.path.join('data', 'batch_state.json')
+
+@pytest.fixture
+def workspace(servers, make_workspace):
+    """
+    A workspace with 4 'Pending' jobs of 2 contacts each, none covered by the local skills taxonomy.
+    """
+    return make_workspace(['--jobs', '4', '--contacts', '2', '--local-share', '0'], *servers)
+
+@pytest.fixture
+def submitted_batches(monkeypatch):
+    """
+    Records the number of requests of every batch submitted to the fake server.
+    """
+    sizes = []
+    submit_batch = batch_handler.submit_batch
+    def counting_submit_batch(requests):
+        sizes.append(len(requests))
+        return submit_batch(requests)
+    monkeypatch.setattr(batch_handler, 'submit_batch', counting_submit_batch)
+    return sizes
+
+def run_main(*args):
+    try:
+        main.main(list(args))
+    except SystemExit as e:
+        return e.code or 0
+    return 0
+
+def read_tracker():
+    return pd.read_excel(TRACKER_PATH, dtype=str).fillna('')
+
+def assert_jobs_ready(tracker):
+    assert list(tracker['Status']) == ['Ready to Send'] * len(tracker)
+    for _, row in tracker.iterrows():
+        assert row['Technical Skills']
+        emails = json.loads(row['Cover Letter/Message'])
+        assert len(emails) == 2
+        assert all(email['subject'] and email['body'] for email in emails)
+
+def test_batch_run_merges_results(workspace, submitted_batches):
+    assert run_main('--mode', 'BATCH') == 0
+
+    assert_jobs_ready(read_tracker())
+    assert submitted_batches == [4, 8] # One skill request per job, then one email per contact.
+    assert not os.path.exists(STATE_PATH)
+
+def test_batch_run_resumes_after_interruption(workspace, submitted_batches, monkeypatch):
+    wait_for_batch = batch_handler.wait_for_batch
+    def interrupted(batch_id, poll_interval=60):
+        raise ConnectionError("connection lost")
+    monkeypatch.setattr(batch_handler, 'wait_for_batch', interrupted)
+    assert run_main('--mode', 'BATCH') == 1
+
+    state = batch_handler.load_state(STATE_PATH)
+    assert state['phase'] == 'skills' and state['batch_id']
+    assert set(read_tracker()['Status']) == {'Pending'}
+
+    monkeypatch.setattr(batch_handler, 'wait_for_batch', wait_for_batch)
+    assert run_main('--mode', 'BATCH') == 0
+
+    assert_jobs_ready(read_tracker())
+    assert submitted_batches == [4, 8] # The skills batch was collected, not submitted again.
+    assert not os.path.exists(STATE_PATH)
+
+def test_rerun_of_unchanged_rows_is_served_from_cache(workspace, submitted_batches):
+    assert run_main('--mode', 'BATCH') == 0
+    tracker = read_tracker()
+    tracker['Status'] = 'Pending'
+    tracker.to_excel(TRACKER_PATH, index=False)
+
+    assert run_main('--mode', 'BATCH') == 0
+
+    assert_jobs_ready(read_tracker())
+    assert submitted_batches == [4, 8] # The second run submitted nothing.
+
+def test_leftover_state_is_discarded(workspace, submitted_batches):
+    # A finished batch whose jobs were recovered from the journal and are no longer 'Pending'.
+    batch_handler.save_state(STATE_PATH, {
+        "phase": "done", "batch_id": None, "rows": {"0": {"job_title": "Old job", "company": "Old company"}}, "skills": {}, "emails": {},
+    })
+    assert run_main('--mode', 'BATCH') == 0
+
+    assert_jobs_ready(read_tracker())
+    assert submitted_batches == [4, 8]
+    assert not os.path.exists(STATE_PATH)
+
+def test_export_clears_finished_state(workspace):
+    tracker = read_tracker()
+    journal = journal_handler.TrackerJournal(journal_handler.default_journal_path(TRACKER_PATH))
+    journal.record(0, tracker.loc[0], {'Status': 'Ready to Send'})
+    journal.close()
+    batch_handler.save_state(STATE_PATH, {
+        "phase": "done", "batch_id": None, "rows": {"0": {"job_title": tracker.at[0, 'Job Title'], "company": tracker.at[0, 'Company']}}, "skills": {}, "emails": {},
+    })
+
+    assert run_main('--export') == 0
+
+    assert read_tracker().at[0, 'Status'] == 'Ready to Send'
+    assert not os.path.exists(STATE_PATH)
@@ -0,0 +1,41 @@
+# Job description compaction: the compacted text stays within the budget and is never empty.
+import pytest
+
+from modules.context_handler import ContextCompactor, count_tokens, select_passages, trim_to_tokens
+
+LONG_SENTENCE = "We build scalable data platforms for logistics customers across many regions and time zones"
+
+def compactor(budget):
+    return ContextCompactor("# Jane Doe\n\nPython developer.", job_description_token_budget=budget)
+
+def test_relevant_passages_are_kept():
+    description = "\n\n".join([
+        "About us: " + LONG_SENTENCE + ".",
+        "- Strong Python and Django experience",
+        "- Office snacks and a gym membership " * 5,
+    ])
+    result = compactor(30).compact_job_description(description, "Python Django developer")
+    assert "Python and Django" in result
+    assert count_tokens(result) <= 30
+
+def test_one_long_paragraph_is_split_into_sentences():
+    sentences = [LONG_SENTENCE + f" number {i}." for i in range(20)] + ["You will write Kubernetes operators in Go."]
+    result = compactor(40).compact_job_description(" ".join(sentences), "Kubernetes Go")
+    assert "Kubernetes operators in Go." in result
+    assert count_tokens(result) <= 40
+
+@pytest.mark.parametrize('budget', [1, 5, 20])
+def test_one_long_sentence_is_trimmed_at_a_word(budget):
+    description = " ".join([LONG_SENTENCE] * 30)
+    result = compactor(budget).compact_job_description(description, "data platforms")
+    assert result
+    assert description.startswith(result)
+    assert description[len(result)] == " " or len(result.split()) == 1
+
+def test_select_passages_never_returns_nothing():
+    passages = ["short", "x " * 500]
+    assert select_passages(passages[1:], [1.0], 10)
+    assert select_passages(passages, [0.0, 1.0], 10) == ["short"]
+
+def test_trim_to_tokens_keeps_short_text():
+    assert trim_to_tokens("  Python developer  ", 50) == "Python developer"
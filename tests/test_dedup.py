@@ -0,0 +1,33 @@
+# Near-duplicate detection: cross-posted jobs are found, different roles of one company are not.
+import pandas as pd
+
+import main
+from modules.dedup_handler import DuplicateFinder
+
+BOILERPLATE = (
+    "Acme builds logistics software used by thousands of warehouses across Europe. We are a remote-first team with "
+    "flexible hours, a generous learning budget, yearly offsites and a modern laptop of your choice. We value "
+    "ownership, clear written communication and shipping small changes every day. Our hiring process has three "
+    "short interviews and a paid take-home project, and we answer every application within one week. "
+)
+FRONTEND = BOILERPLATE + "You will build our React and TypeScript dashboard."
+BACKEND = BOILERPLATE + "You will build our Go services on PostgreSQL."
+
+def tracker(rows):
+    return pd.DataFrame(rows, columns=['Company', 'Job Title', 'Job Description'])
+
+def test_different_roles_of_one_company_are_not_duplicates():
+    df = tracker([
+        ('Acme', 'Frontend Engineer', FRONTEND),
+        ('Acme', 'Backend Engineer', BACKEND),
+    ])
+    assert DuplicateFinder().clusters(dict(enumerate(df['Job Description'])), groups=dict.fromkeys(df.index, 'acme')) == {1: 0}
+    assert main.find_duplicate_jobs(df, DuplicateFinder()) == {}
+
+def test_cross_posted_job_is_a_duplicate():
+    df = tracker([
+        ('Acme Inc.', 'Backend Engineer (m/f/d)', BACKEND),
+        ('Acme', 'Frontend Engineer', FRONTEND),
+        ('ACME', 'Backend engineer', BACKEND + " Apply through our careers page."),
+    ])
+    assert main.find_duplicate_jobs(df, DuplicateFinder()) == {2: 0}
@@ -0,0 +1,68 @@
+# MessageBuilder: the messages it builds must parse back to the same headers, body and attachment.
+import base64
+import email
+import email.policy
+import os
+
+import pytest
+
+from modules.email_handler import MessageBuilder
+
+def parse(message):
+    return email.message_from_bytes(base64.urlsafe_b64decode(message['raw']), policy=email.policy.default)
+
+def make_builder(tmp_path, sender, filename, data=b'%PDF-1.4 test'):
+    path = tmp_path / filename
+    path.write_bytes(data)
+    return MessageBuilder(sender, str(path))
+
+@pytest.mark.parametrize('body_length', [0, 1, 2, 3, 100])
+def test_ascii_message_round_trips(tmp_path, body_length):
+    data = os.urandom(5000)
+    builder = make_builder(tmp_path, 'me@example.com', 'CV.pdf', data)
+    body = '<p>' + 'x' * body_length + '</p>'
+    parsed = parse(builder.build('hr@example.com', 'Application', body))
+
+    assert parsed['To'] == 'hr@example.com'
+    assert parsed['From'] == 'me@example.com'
+    assert parsed['Subject'] == 'Application'
+    html, attachment = parsed.iter_parts()
+    assert html.get_content().strip() == body
+    assert attachment.get_filename() == 'CV.pdf'
+    assert attachment.get_content() == data
+
+def test_non_ascii_headers_are_encoded(tmp_path):
+    builder = make_builder(tmp_path, 'José Müller <jose@example.com>', 'Lebenslauf Müller.pdf')
+    message = builder.build('Zoë Ünal <zoe@bücher.example>', 'Candidature — développeur', '<p>Bonjour Zoë,</p>')
+    assert base64.urlsafe_b64decode(message['raw']).isascii()
+
+    parsed = parse(message)
+    assert parsed['From'].addresses[0].display_name == 'José Müller'
+    assert parsed['From'].addresses[0].addr_spec == 'jose@example.com'
+    assert parsed['To'].addresses[0].display_name == 'Zoë Ünal'
+    assert parsed['To'].addresses[0].domain == 'xn--bcher-kva.example'
+    assert parsed['Subject'] == 'Candidature — développeur'
+    html, attachment = parsed.iter_parts()
+    assert 'Bonjour Zoë' in html.get_content()
+    assert attachment.get_filename() == 'Lebenslauf Müller.pdf'
+
+def test_several_recipients(tmp_path):
+    builder = make_builder(tmp_path, 'me@example.com', 'CV.pdf')
+    parsed = parse(builder.build('a@example.com, Ana Núñez <b@example.com>', 'Hi', '<p>Hi</p>'))
+    assert [address.addr_spec for address in parsed['To'].addresses] == ['a@example.com', 'b@example.com']
+    assert parsed['To'].addresses[1].display_name == 'Ana Núñez'
+
+def test_unencodable_address_is_rejected(tmp_path):
+    builder = make_builder(tmp_path, 'me@example.com', 'CV.pdf')
+    with pytest.raises(ValueError):
+        builder.build('jürgen@example.com', 'Hi', '<p>Hi</p>')
+
+def test_long_non_ascii_subject_is_folded_with_crlf(tmp_path):
+    builder = make_builder(tmp_path, 'me@example.com', 'CV.pdf')
+    subject = "Candidature spontanée pour le poste de développeur backend senior à Montréal — expérience Python"
+    message = builder.build('hr@example.com', subject, '<p>Bonjour</p>')
+
+    header_block = base64.urlsafe_b64decode(message['raw']).split(b'\r\n\r\n', 1)[0]
+    assert b'\n' not in header_block.replace(b'\r\n', b'')
+    assert b'\r\n ' in header_block # The subject is folded.
+    assert parse(message)['Subject'] == subject
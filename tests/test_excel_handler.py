@@ -0,0 +1,14 @@
+# Reading the tracker: cached reads must never return another workbook's data.
+import pandas as pd
+
+from modules import excel_handler
+
+def test_workbooks_with_the_same_signature_are_read_separately(tmp_path, monkeypatch):
+    first, second = tmp_path / 'first.xlsx', tmp_path / 'second.xlsx'
+    pd.DataFrame({'Status': ['Pending'], 'Company': ['Acme']}).to_excel(first, index=False)
+    pd.DataFrame({'Status': ['Applied'], 'Company': ['Zeta']}).to_excel(second, index=False)
+    # Both workbooks have the same modification time and size.
+    monkeypatch.setattr(excel_handler, 'workbook_signature', lambda file_path: {"mtime_ns": 1, "size": 1})
+
+    assert excel_handler.read_excel_file(str(first)).at[0, 'Company'] == 'Acme'
+    assert excel_handler.read_excel_file(str(second)).at[0, 'Company'] == 'Zeta'
@@ -0,0 +1,45 @@
+# Sending 'Approved' jobs: jobs held back by Gmail rate limits or an unreachable server must stay 'Approved',
+# real errors become 'Failed'.
+import socket
+
+import pandas as pd
+
+import fake_servers
+import main
+from conftest import TRACKER_PATH
+from modules import email_handler
+
+def unused_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def run_approved_jobs(make_workspace, gmail_settings, extra_args=(), gmail_port=None):
+    """
+    Sends 3 'Approved' jobs of 2 contacts each in FULL mode and returns their final statuses.
+    With `gmail_port`, Gmail is expected at that port instead of the fake server.
+    """
+    process, openai_port, fake_gmail_port = fake_servers.start_servers({}, gmail_settings)
+    try:
+        make_workspace(['--jobs', '3', '--contacts', '2', '--approved', *extra_args], openai_port, gmail_port or fake_gmail_port)
+        try:
+            main.main(['--mode', 'FULL'])
+        except SystemExit as e:
+            assert not e.code
+        return list(pd.read_excel(TRACKER_PATH, dtype=str)['Status'])
+    finally:
+        process.terminate()
+
+def test_rate_limited_jobs_stay_approved(make_workspace):
+    statuses = run_approved_jobs(make_workspace, {'rate_limit': 0.2}, ['--max-wait', '2'])
+    assert statuses == ['Approved'] * 3
+
+def test_send_errors_mark_jobs_failed(make_workspace, monkeypatch):
+    monkeypatch.setattr(email_handler.time, 'sleep', lambda seconds: None) # Skip the retry backoff.
+    statuses = run_approved_jobs(make_workspace, {'error_rate': 1.0})
+    assert statuses == ['Failed'] * 3
+
+def test_unreachable_gmail_keeps_jobs_approved(make_workspace, monkeypatch):
+    monkeypatch.setattr(email_handler.time, 'sleep', lambda seconds: None)
+    statuses = run_approved_jobs(make_workspace, {}, gmail_port=unused_port())
+    assert statuses == ['Approved'] * 3
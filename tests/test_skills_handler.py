@@ -0,0 +1,46 @@
+# Local skill extraction: ordinary words that are also skill names must not be taken for skills.
+import os
+
+import pandas as pd
+import pytest
+
+from conftest import ROOT
+from modules.skills_handler import SkillTaxonomy
+
+@pytest.fixture
+def taxonomy():
+    return SkillTaxonomy.load(os.path.join(ROOT, 'skills_taxonomy.yaml'))
+
+SALES_DESCRIPTION = """Account Executive
+- React quickly to customer requests and keep our CRM up to date.
+- Express ideas clearly to clients; strong communication skills.
+- Join a swift, fast-paced team and take ownership of your territory.
+- Be a key node of our network of partners, with a focus on security and analytics.
+- You will excel at negotiation and relationship building."""
+
+def test_ordinary_words_are_not_skills(taxonomy):
+    skills = SkillTaxonomy.load(os.path.join(ROOT, 'skills_taxonomy.yaml'), confidence_threshold=0).extract(SALES_DESCRIPTION)
+    assert skills['technical_skills'] == ['CRM']
+
+def test_ambiguous_names_match_in_tech_context(taxonomy):
+    skills = taxonomy.extract(
+        "- 4+ years of experience with React and TypeScript\n"
+        "- Node.js and Express.js APIs on AWS\n"
+        "- Rust or Swift is a plus\n"
+        "- Strong communication skills and a team player"
+    )
+    assert {'React', 'TypeScript', 'Node.js', 'Express', 'AWS', 'Rust', 'Swift'} <= set(skills['technical_skills'])
+
+def test_ambiguous_matches_do_not_count_towards_coverage(taxonomy):
+    description = (
+        "- Experience with React and Swift\n"
+        "- You know Rust and Ruby well\n"
+        "- Strong communication skills required"
+    )
+    assert taxonomy.extract(description) is None
+
+def test_learning_does_not_add_ambiguous_names_case_insensitively(taxonomy):
+    df = pd.DataFrame({'Technical Skills': ['react, Go kit', 'React, Go kit'], 'Soft Skills': ['', '']})
+    assert taxonomy.learn_from_tracker(df) == 1
+    assert taxonomy.knows('Go kit')
+    assert taxonomy.extract("- React quickly to customer requests with great communication skills") is None
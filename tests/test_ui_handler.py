@@ -0,0 +1,43 @@
+# ProgressDisplay: lines printed while the live line is shown must not be written through it.
+import io
+import sys
+import threading
+
+from modules import ui_handler
+
+class FakeConsole(io.StringIO):
+    def isatty(self):
+        return True
+
+def test_prints_appear_above_the_live_line(monkeypatch):
+    console = FakeConsole()
+    monkeypatch.setattr(sys, 'stdout', console)
+    progress = ui_handler.ProgressDisplay(2)
+    progress.tracker('job', 'Developer')(1)
+
+    def worker(number):
+        for i in range(50):
+            print(f"worker {number} line {i}")
+    threads = [threading.Thread(target=worker, args=(number,)) for number in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    progress.finish('job')
+    progress.close()
+
+    assert sys.stdout is console
+    # Each printed line starts after the live line was cleared and is written whole.
+    lines = [line.split('\r')[-1] for line in console.getvalue().split('\n')]
+    printed = sorted(line for line in lines if line.startswith('worker'))
+    assert printed == sorted(f"worker {number} line {i}" for number in range(4) for i in range(50))
+    assert lines[-2].strip().startswith('Emails: 1/2')
+
+def test_nothing_is_wrapped_without_a_console(monkeypatch):
+    output = io.StringIO()
+    monkeypatch.setattr(sys, 'stdout', output)
+    progress = ui_handler.ProgressDisplay(1)
+    assert sys.stdout is output
+    print("Connecting to OpenAI to generate email...")
+    progress.close()
+    assert output.getvalue() == "Connecting to OpenAI to generate email...\n"
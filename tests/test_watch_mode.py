@@ -0,0 +1,89 @@
+# Watch mode after a failed save: journaled changes must be replayed, so no job is emailed twice.
+import os
+
+import pandas as pd
+import pytest
+
+import fake_servers
+import main
+from conftest import TRACKER_PATH
+from modules import excel_handler
+
+JOBS, CONTACTS = 3, 2
+
+@pytest.fixture
+def workspace(servers, make_workspace):
+    """
+    A workspace with 3 'Approved' jobs of 2 contacts each.
+    """
+    return make_workspace(['--jobs', str(JOBS), '--contacts', str(CONTACTS), '--approved'], *servers)
+
+def sent_messages(servers):
+    return fake_servers.get_stats(servers[1]).get('sent', 0)
+
+def test_failed_save_is_replayed_and_retried(workspace, servers, monkeypatch):
+    write_excel_file = excel_handler.write_excel_file
+    def failing_write(df, file_path):
+        raise PermissionError("the file is locked")
+    monkeypatch.setattr(excel_handler, 'write_excel_file', failing_write)
+
+    polls = []
+    def poll(seconds):
+        polls.append(seconds)
+        if len(polls) == 1:
+            # The user edits the tracker while the assistant's changes are only in the journal.
+            stat = os.stat(TRACKER_PATH)
+            os.utime(TRACKER_PATH, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        elif len(polls) == 2:
+            monkeypatch.setattr(excel_handler, 'write_excel_file', write_excel_file)
+        elif len(polls) == 4:
+            raise KeyboardInterrupt
+    monkeypatch.setattr(main.time, 'sleep', poll)
+
+    sent_before = sent_messages(servers)
+    try:
+        main.main(['--mode', 'FULL', '--watch'])
+    except SystemExit as e:
+        assert not e.code
+
+    assert sent_messages(servers) - sent_before == JOBS * CONTACTS
+    tracker = pd.read_excel(TRACKER_PATH, dtype=str)
+    assert list(tracker['Status']) == ['Applied'] * JOBS
+    assert not main.journal_handler.TrackerJournal(main.journal_handler.default_journal_path(TRACKER_PATH)).has_changes()
+
+def test_failed_pass_does_not_stop_watching(workspace, servers, monkeypatch):
+    process_tracker = main.process_tracker
+    calls = []
+    def flaky_process_tracker(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 2:
+            raise ConnectionError("connection lost")
+        return process_tracker(*args, **kwargs)
+    monkeypatch.setattr(main, 'process_tracker', flaky_process_tracker)
+
+    write_excel_file = excel_handler.write_excel_file
+    polls = []
+    def poll(seconds):
+        polls.append(seconds)
+        if len(polls) == 1:
+            # The user approves the first job again, e.g. after editing its email.
+            tracker = excel_handler.read_excel_file(TRACKER_PATH)
+            tracker.at[0, 'Status'] = 'Approved'
+            write_excel_file(tracker, TRACKER_PATH)
+        elif len(polls) == 2:
+            stat = os.stat(TRACKER_PATH)
+            os.utime(TRACKER_PATH, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        elif len(polls) == 4:
+            raise KeyboardInterrupt
+    monkeypatch.setattr(main.time, 'sleep', poll)
+
+    sent_before = sent_messages(servers)
+    try:
+        main.main(['--mode', 'FULL', '--watch'])
+    except SystemExit as e:
+        assert not e.code
+
+    # The pass that failed is retried once the tracker changes again.
+    assert len(calls) == 3
+    assert sent_messages(servers) - sent_before == (JOBS + 1) * CONTACTS
+    assert list(pd.read_excel(TRACKER_PATH, dtype=str)['Status']) == ['Applied'] * JOBS